@@ -0,0 +1,59 @@
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+# least recently used cache with hit and miss counters.
+# a maxsize of 0 disables caching. with a weigher, maxsize limits the
+# total weight of the values, e.g. their size in bytes, instead of
+# their number.
+class LRUCache:
+    def __init__(self, maxsize = 256, weigher = None):
+        self.maxsize  = maxsize
+        self.weigher  = weigher
+        self.hits     = 0
+        self.misses   = 0
+        self.__items  = OrderedDict()
+        self.__weight = 0
+
+    # return the cached value or None
+    def get(self, key):
+        value = self.__items.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.__items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        if key in self.__items:
+            self.__weight -= self.__weigh(self.__items.pop(key))
+        weight = self.__weigh(value)
+        # values larger than the whole cache are not kept
+        if weight > self.maxsize:
+            return
+        self.__items[key] = value
+        self.__items.move_to_end(key)
+        self.__weight += weight
+        while self.__weight > self.maxsize:
+            _, evicted = self.__items.popitem(last = False)
+            self.__weight -= self.__weigh(evicted)
+
+    def __weigh(self, value):
+        return 1 if self.weigher is None else self.weigher(value)
+
+    def clear(self):
+        self.__items.clear()
+        self.__weight = 0
+        self.hits = 0
+        self.misses = 0
+
+    # currsize is the total weight, the number of values without a weigher
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, self.__weight)
+
+    def __len__(self):
+        return len(self.__items)
@@ -1,32 +1,64 @@
 import tkinter as tk
-from multipledispatch import dispatch
 
+import contextlib
 import math
+import os
+from collections import namedtuple
 
-from PIL import Image, ImageTk, ImageDraw, ImageColor
-from pyscreenshot import grab
+import numpy as np
+from PIL import Image, ImageDraw, ImageColor
 
 from EasyDraw import Vector
+from EasyDraw import Export
+from EasyDraw.Renderer import TkRenderer, FramebufferRenderer, MirrorRenderer, RetainedRenderer, Sprite
+from EasyDraw.Shape import Shape
+from EasyDraw.Cache import LRUCache
+
+# matrix (a, b, c, d, e, f) leaving coordinates unchanged
+IDENTITY = (1.0, 0.0, 0.0, 0.0, 1.0, 0.0)
+
+# transformation of a stack level: origin, rotation, zoom, flip and the
+# affine matrix (a, b, c, d, e, f) composed by apply_matrix, which is
+# applied before the others. it is small and immutable, so push shares it
+# and a transform call replaces it without copying the style parameters.
+Transform = namedtuple('Transform', ['center_x', 'center_y', 'rotate_deg', 'text_rotate_deg',
+                                     'zoom', 'flip_x', 'flip_y', 'matrix'])
+
+# renderer methods measured as the 'tk' and 'rasterize' phases of a frame
+TK_METHODS = ('sprite', 'image', 'line', 'arc', 'rectangle', 'oval',
+              'polygon', 'point', 'text', 'update', 'delete')
+RASTER_METHODS = ('sprite', 'image', 'line', 'arc', 'rectangle', 'oval',
+                  'polygon', 'point', 'text', 'repaint')
+
+# stands in for a timer measurement when frames are not timed
+UNTIMED = contextlib.nullcontext()
+
+
+# memory used by the pixels of an image, in bytes
+def image_size(image):
+    return image.width * image.height * len(image.getbands())
 
 # Extends functionality of tk.canvas
 class Canvas:
+    # methods returning a Shape handle in retained mode
+    PRIMITIVES = ('circle', 'rect', 'line', 'triangle', 'arc',
+                  'end_shape', 'text', 'point', 'create_image',
+                  'polyline', 'circles', 'rects', 'lines')
+
     def __init__(self, master, **kwargs):
-        # stores pushed parameters
+        # stores pushed style parameters. push shares the parameters with
+        # the level below, they are copied on the first change after a push
         self.__hist = []
         self.__hist.append({})
-        # frames to export as a GIF file
-        self.__frames = []
-        # flip canvas
-        self.__parameters()['flip_x']          = False
-        self.__parameters()['flip_y']          = False
-        # canvas origin position
-        self.__parameters()['center_x']        = 0
-        self.__parameters()['center_y']        = 0
-        # rotation degree
-        self.__parameters()['rotate_deg']      = 0
-        self.__parameters()['text_rotate_deg'] = 0
-        # zoom value
-        self.__parameters()['zoom']            = 1
+        # whether each level owns its parameters or shares them
+        self.__owned = [True]
+        # transformation of each level, see Transform
+        self.__transforms = [Transform(center_x = 0, center_y = 0,
+                                       rotate_deg = 0, text_rotate_deg = 0,
+                                       zoom = 1, flip_x = False, flip_y = False,
+                                       matrix = IDENTITY)]
+        # writes exported frames to a file
+        self.__writer = None
         # fill and stroke color
         self.__parameters()['fill_color']      = 'white'
         self.__parameters()['stroke_color']    = 'black'
@@ -35,11 +67,27 @@ class Canvas:
         self.__parameters()['stroke_disabled'] = False
         # vertices data to create polygon
         self.__vertices        = []
+        # RGBA pixel buffer drawn over the frame as one image, created on first use
+        self.__pixels          = None
+        self.__pixels_changed  = False
+        # what shows the pixel buffer and the overlay, see __draw_layer
+        self.__pixel_layer     = None
+        self.__overlay_layer   = None
+        self.__overlay_sprite  = None
+        # affine matrix of the current transformation and the state it was built from
+        self.__matrix          = None
+        self.__matrix_key      = None
+        self.__coefficients    = None
 
         self.__width           = kwargs.get('width', 0)
         self.__height          = kwargs.get('height', 0)
-        # list of shapes drawn on PhotoImage
-        self.__alpha_shapes    = []
+        # rasterized circles and rectangles, reused while their
+        # size, colors, stroke and rotation do not change
+        self.__sprites         = LRUCache(kwargs.get('spriteCacheSize', 256))
+        # decoded image files and their scaled and rotated versions,
+        # limited by their size in bytes, see __asset_size
+        self.__assets          = LRUCache(kwargs.get('assetCacheSize', 64 * 1024 * 1024),
+                                          weigher = self.__asset_size)
         # font styles
         self.__parameters()['font_family']     = 'Tahoma 20'
         self.__parameters()['font_color']      = 'black'
@@ -48,104 +96,268 @@ class Canvas:
         self.__parameters()['image_anchor']    = 'center'
         
         # tkinter's default methods are available in handle
-        self.handle = tk.Canvas(master,
-                                width = self.__width,
-                                height = self.__height,
-                                background = kwargs.get('background', 'black'),
-                                highlightthickness = 0)
+        # there is no handle when the canvas is created without a window
+        if master is None:
+            self.handle = None
+        else:
+            self.handle = tk.Canvas(master,
+                                    width = self.__width,
+                                    height = self.__height,
+                                    background = kwargs.get('background', 'black'),
+                                    highlightthickness = 0)
         self.app = kwargs.get('app', None)
         self.__showGrid = kwargs.get('showGrid', False)
+        self.__background = kwargs.get('background', 'black')
+        # 'auto' draws opaque circles, rectangles and polygons as tkinter
+        # vector items and other shapes as images, 'native' and 'image' force either
+        self.__shape_mode = kwargs.get('shapeMode', 'auto')
+        if self.__shape_mode not in ('auto', 'native', 'image'):
+            raise ValueError("invalid shape mode, expected 'auto', 'native' or 'image' but '%s' was entered." % self.__shape_mode)
+        # measures rendering phases of frames, see set_timer
+        self.__timer = None
+        # 'tk' creates a canvas item per shape,
+        # 'framebuffer' rasterizes all shapes into one image per frame
+        self.__renderer_name = kwargs.get('renderer', 'tk')
+        if self.__renderer_name == 'tk':
+            if self.handle is None:
+                raise ValueError("the 'tk' renderer requires a window, use 'framebuffer' instead.")
+            self.__renderer = TkRenderer(self.handle)
+        elif self.__renderer_name == 'framebuffer':
+            self.__renderer = FramebufferRenderer(self.__width,
+                                                  self.__height,
+                                                  kwargs.get('background', 'black'),
+                                                  self.handle,
+                                                  dirty = kwargs.get('dirtyRects', False),
+                                                  showDirty = kwargs.get('showDirty', False))
+        else:
+            raise ValueError("invalid renderer, expected 'tk' or 'framebuffer' but '%s' was entered." % self.__renderer_name)
+        # buffer holding the rendered pixels of each frame.
+        # in tk mode shapes are mirrored into it only when capturing.
+        self.__framebuffer = None
+        if self.__renderer_name == 'framebuffer':
+            self.__framebuffer = self.__renderer
+        elif kwargs.get('capture', False):
+            self.__framebuffer = FramebufferRenderer(self.__width,
+                                                     self.__height,
+                                                     kwargs.get('background', 'black'))
+            self.__renderer = MirrorRenderer(self.__renderer, self.__framebuffer)
+        # in retained mode drawn shapes persist across frames and
+        # primitives return Shape handles to change them in place
+        self.__retained = kwargs.get('retained', False)
+        if self.__retained:
+            display = None if self.__renderer_name == 'framebuffer' else TkRenderer(self.handle)
+            self.__renderer = RetainedRenderer(display, self.__framebuffer)
+            for name in self.PRIMITIVES:
+                setattr(self, name, self.__retain(getattr(self, name)))
         # no transparent background
-        self.handle.create_rectangle(0, 0,
-                                     self.__width, self.__height,
-                                     fill = kwargs.get('background', 'black'),
-                                     outline = kwargs.get('background', 'black'))
-        self.handle.pack(expand = 1)
+        self.__renderer.rectangle([(0, 0), (self.__width, self.__height)],
+                                  kwargs.get('background', 'black'),
+                                  kwargs.get('background', 'black'))
+        if self.handle is not None:
+            self.handle.pack(expand = 1)
 
     # clear content data
     def clear_data(self):
-        self.__alpha_shapes.clear()
+        self.__renderer.clear_data()
         self.__vertices.clear()
 
-    # take a screenshot of the app window
-    def __pack(self):
-        if self.handle.winfo_width() < 10:
-            return False
-
-        return grab(bbox=(self.handle.winfo_rootx(),
-                          self.handle.winfo_rooty(),
-                          self.handle.winfo_rootx() + self.handle.winfo_width(),
-                          self.handle.winfo_rooty() + self.handle.winfo_height()))
-
-    # append current frame to list
+    # wrap a primitive so it returns a handle to the shape it draws
+    def __retain(self, method):
+        def primitive(*args, **kwargs):
+            renderer = self.__renderer
+            # primitives drawn by other primitives belong to their shape
+            if renderer.recording is not None or renderer.replacing is not None:
+                return method(*args, **kwargs)
+            renderer.recording = []
+            vertices = list(self.__vertices)
+            try:
+                method(*args, **kwargs)
+            finally:
+                commands = renderer.recording
+                renderer.recording = None
+            return Shape(self.__redraw, self.__remove,
+                         method, args, kwargs,
+                         {**self.__parameters(), **self.__transforms[-1]._asdict()},
+                         vertices,
+                         commands)
+        return primitive
+
+    # draw a retained shape again using its own parameters
+    def __redraw(self, shape):
+        if shape.removed:
+            return
+        hist, owned, transforms, vertices = self.__hist, self.__owned, self.__transforms, self.__vertices
+        self.__hist, self.__owned = [shape.parameters], [False]
+        self.__transforms = [Transform(*(shape.parameters[name] for name in Transform._fields))]
+        self.__vertices = list(shape.vertices)
+        self.__renderer.replacing = []
+        try:
+            shape.method(*shape.args, **shape.kwargs)
+        finally:
+            commands = self.__renderer.replacing
+            self.__renderer.replacing = None
+            self.__hist, self.__owned, self.__transforms, self.__vertices = hist, owned, transforms, vertices
+        self.__renderer.replace(shape.commands, commands)
+        shape.commands = commands
+
+    def __remove(self, shape):
+        self.__renderer.remove(shape.commands)
+
+    # tkinter items of a Shape handle or item reference
+    def __items(self, target):
+        return target.items if isinstance(target, Shape) else [target]
+
+    # hits, misses and size of the sprite cache
+    def sprite_cache_info(self):
+        return self.__sprites.info()
+
+    # hits, misses and size in bytes of the image asset cache
+    def asset_cache_info(self):
+        return self.__assets.info()
+
+    # regions of the screen changed in the last frame, as (x1, y1, x2, y2).
+    # only tracked by the framebuffer renderer with dirtyRects enabled
+    def dirty_regions(self):
+        if self.__framebuffer is None or not self.__framebuffer.dirty:
+            return [(0, 0, self.__width, self.__height)]
+        return list(self.__framebuffer.dirty_boxes)
+
+    # push the rendered frame to the screen
+    def present(self):
+        self.__flush_pixels()
+        self.__renderer.present()
+
+    # bytes held by a cached asset. with the tk renderer a sprite also
+    # keeps a PhotoImage of the same size once it is drawn
+    def __asset_size(self, asset):
+        if isinstance(asset, Sprite):
+            return image_size(asset.image) * (2 if self.__renderer_name == 'tk' else 1)
+        return image_size(asset)
+
+    # copy of the rendered frame.
+    # requires the framebuffer renderer or capture mode
+    def snapshot(self):
+        if self.__framebuffer is None:
+            raise Exception('Nothing is captured, use the framebuffer renderer or enable capture!')
+        self.__flush_pixels()
+        self.__renderer.flush()
+        return self.__framebuffer.buffer.copy()
+
+    # start mirroring shapes into a framebuffer, so the rendered pixels
+    # can be read. only retained mode can do this later on, as it redraws
+    # the framebuffer from the display list; tk items drawn before cannot
+    # be read back, so otherwise capture has to be enabled up front.
+    def __capture(self):
+        if self.__framebuffer is not None:
+            return
+        if not self.__retained:
+            raise Exception('Nothing is captured, use the framebuffer renderer or enable capture!')
+        self.__framebuffer = FramebufferRenderer(self.__width, self.__height, self.__background)
+        self.__renderer.attach(self.__framebuffer)
+        if self.__timer is not None:
+            self.__time_renderer(self.__framebuffer, 'rasterize', RASTER_METHODS)
+
+    # measure the time spent creating tkinter items and rasterizing with
+    # PIL as the 'tk' and 'rasterize' phases of a Timing.FrameTimer
+    def set_timer(self, timer):
+        self.__timer = timer
+        renderer = self.__renderer
+        for display in (renderer, getattr(renderer, 'renderer', None), getattr(renderer, 'display', None)):
+            if isinstance(display, TkRenderer):
+                self.__time_renderer(display, 'tk', TK_METHODS)
+        if self.__framebuffer is not None:
+            self.__time_renderer(self.__framebuffer, 'rasterize', RASTER_METHODS)
+
+    def __time_renderer(self, renderer, phase, methods):
+        for name in methods:
+            setattr(renderer, name, self.__timer.timed(phase, getattr(renderer, name)))
+
+    # measurement of a phase, or nothing when frames are not timed
+    def __timed(self, phase):
+        return UNTIMED if self.__timer is None else self.__timer.measure(phase)
+
+    # start writing exported frames to a file.
+    # the format is chosen by the extension of path
+    def start_recording(self, path, fps, workers = None):
+        self.__writer = Export.create_writer(path, fps, workers)
+
+    # write current frame to the recording
     def export_frame(self):
-        im = self.__pack()
-        if im:
-            self.__frames.append(im)
+        if self.__writer is None:
+            raise Exception('ExportError: recording has not been started!')
+        self.__writer.write(self.snapshot())
+
+    # finish the recording file
+    def save_frames(self):
+        if self.__writer is not None:
+            self.__writer.close()
+            self.__writer = None
+
+    # 3x3 affine matrix mapping canvas coordinates to screen coordinates.
+    # it is rebuilt only when translate, rotate, zoom, flip, the applied
+    # matrix or the app bounds have changed since the last call.
+    def transform_matrix(self, offset=None):
+        t = self.__transforms[-1]
+        app = self.app
+        key = (t, offset, app.useBounds)
+        if app.useBounds:
+            key += (app.scale_x, app.scale_y, app.bound_center)
+        if key == self.__matrix_key:
+            return self.__matrix
 
-    # save frames to file
-    def save_frames(self, path, interval):
-        try:
-            self.__frames[0].save(path,
-                                  format = 'GIF',
-                                  append_images = self.__frames[1:],
-                                  save_all = True,
-                                  optimize = True,
-                                  duration = interval,
-                                  loop = 0)
-            return True
-        except:
-            raise Exception('ExportError: unable to save frames to GIF file!')
-
-    # transform coordinates based on origin and rotation value
-    def transform_coords(self, coords, offset=None):
         if offset is not None:
             cx, cy = offset
         else:
-            cx, cy = self.__parameters()['center_x'], self.__parameters()['center_y']
-
-        if self.app.useBounds:
-            cx = self.app.bound_center[0] + (cx * self.app.scale_x)
-            cy = self.app.bound_center[1] + (cy * self.app.scale_y)
+            cx, cy = t.center_x, t.center_y
 
-        angle = math.radians(self.__parameters()['rotate_deg'])
+        # flip, then rotate, then scale to bounds, then zoom
+        angle = math.radians(t.rotate_deg)
         cos_val, sin_val = math.cos(angle), math.sin(angle)
+        fx = -1 if t.flip_x else 1
+        fy = -1 if t.flip_y else 1
+        sx = sy = t.zoom
+        if app.useBounds:
+            cx = app.bound_center[0] + (cx * app.scale_x)
+            cy = app.bound_center[1] + (cy * app.scale_y)
+            sx *= app.scale_x
+            sy *= -app.scale_y
+
+        self.__matrix = np.array([[sx * cos_val * fx, -sx * sin_val * fy, cx],
+                                  [sy * sin_val * fx,  sy * cos_val * fy, cy],
+                                  [0.0, 0.0, 1.0]]) @ self.get_matrix()
+        self.__matrix_key = key
+        # the same matrix as plain floats, for transforming python lists
+        self.__coefficients = tuple(self.__matrix[:2].ravel().tolist())
+        return self.__matrix
+
+    # how much the current transformation scales lengths. shapes keeping
+    # their form, such as circles, are sized by it
+    def __scale(self):
+        m = self.transform_matrix()
+        return math.sqrt(abs(m[0, 0] * m[1, 1] - m[0, 1] * m[1, 0]))
+
+    # transform coordinates based on origin and rotation value.
+    # an (N, 2) numpy array is transformed in one step and returned as an
+    # array, other sequences of (x, y) pairs give a list of tuples.
+    def transform_coords(self, coords, offset=None):
+        m = self.transform_matrix(offset)
 
-        flip_y, flip_x = self.__parameters()['flip_y'], self.__parameters()['flip_x']
-
-        new_coords = []
-        for x_old, y_old in coords:
-            # check if canvas is flipped
-            if flip_y:
-                y_old = -y_old
-            if flip_x:
-                x_old = -x_old
-
-            x_new = (x_old * cos_val - y_old * sin_val)
-            y_new = (x_old * sin_val + y_old * cos_val)
-
-            if self.app.useBounds:
-                x_new *= self.app.scale_x
-                y_new *= -self.app.scale_y
-
-            # set zoom
-            x_new *= self.__parameters()['zoom']
-            y_new *= self.__parameters()['zoom']
-
-            new_coords.append((x_new + cx, y_new + cy))
+        if isinstance(coords, np.ndarray):
+            return coords @ m[:2, :2].T + m[:2, 2]
 
-        return new_coords
+        a, b, c, d, e, f = self.__coefficients
+        return [(a * x + b * y + c, d * x + e * y + f) for x, y in coords]
 
     # get center position
     def get_center_pos(self):
-        return (self.__parameters()['center_x'], self.__parameters()['center_y'])
+        t = self.__transforms[-1]
+        return (t.center_x, t.center_y)
 
     # set the coordinates of canvas origin
     # all objects on the canvas are placed relative to these
     # values.
     def translate(self, x, y):
-        self.__parameters()['center_x'] = x
-        self.__parameters()['center_y'] = y
+        self.__transform(center_x = x, center_y = y)
 
     # flip canvas
     def flip(self, direction):
@@ -153,50 +365,49 @@ class Canvas:
         if any(c not in 'xy' for c in d):
             raise ValueError('The parameter must be either "X" or "Y".')
         if 'x' in d:
-            self.__parameters()['flip_x'] = not self.__parameters()['flip_x']
+            self.__transform(flip_x = not self.__transforms[-1].flip_x)
         if 'y' in d:
-            self.__parameters()['flip_y'] = not self.__parameters()['flip_y']
+            self.__transform(flip_y = not self.__transforms[-1].flip_y)
 
     # set rotation value
     def rotate(self, deg):
-        self.__parameters()['rotate_deg'] = deg
+        self.__transform(rotate_deg = deg)
 
     def rotate_text(self, deg):
-        self.__parameters()['text_rotate_deg'] = deg
+        self.__transform(text_rotate_deg = deg)
 
     # set zoom value
     def zoom(self, scale):
-        self.__parameters()['zoom'] = scale
+        self.__transform(zoom = scale)
 
     # set fill color
     def fill(self, color):
-        self.__parameters()['fill_color'] = color
+        self.__set('fill_color', color)
 
     # empty fill value
     def no_fill(self):
-        self.__parameters()['fill_color'] = ''
+        self.__set('fill_color', '')
 
     # set stroke color
     def stroke(self, color):
-        self.__parameters()['stroke_color'] = color
-        self.__parameters()['stroke_disabled'] = False
+        self.__set('stroke_color', color)
+        self.__set('stroke_disabled', False)
 
     # disable stroke
     def no_stroke(self):
-        self.__parameters()['stroke_disabled'] = True
+        self.__set('stroke_disabled', True)
 
     # set stroke width
     def stroke_width(self, width):
-        self.__parameters()['stroke_width'] = width
+        self.__set('stroke_width', width)
 
     # create circle
     def circle(self, x, y, radius, **kwargs):
-        points = self.transform_coords([[x - radius, y - radius], [x + radius, y + radius]])
-
-        cx, cy = map(lambda p: math.floor(sum(p) / 2), zip(*map(lambda p: (p[0], p[1]), points)))
+        (cx, cy), = self.transform_coords([(x, y)])
+        cx, cy = math.floor(cx), math.floor(cy)
 
-        size_multiplier = self.app.scale_x if self.app.useBounds else 1
-        size = ((radius * 2 * size_multiplier) + 1, (radius * 2 * size_multiplier) + 1)
+        diameter = round(radius * 2 * self.__scale()) + 1
+        size = (diameter, diameter)
 
         alpha = int(kwargs.get('alpha', 1) * 255)
         bgAlpha = alpha
@@ -214,28 +425,37 @@ class Canvas:
             stroke_color = self.__parameters()['stroke_color']
 
         stroke = ImageColor.getrgb(stroke_color) + (alpha,)
-        image = Image.new('RGBA', size)
-
-        draw = ImageDraw.Draw(image)
-        draw.ellipse((0, 0, size[0], size[1]), fill=fill, outline=stroke, width=self.__parameters()['stroke_width'])
-
-        rotated_image = image.rotate(-self.__parameters()['rotate_deg'], expand=True)
-        self.__alpha_shapes.append(ImageTk.PhotoImage(rotated_image))
 
-        return self.handle.create_image(cx, cy,
-                                        image=self.__alpha_shapes[-1],
-                                        anchor='center')
+        if self.__native(alpha):
+            half = size[0] / 2
+            return self.__renderer.oval([(cx - half, cy - half), (cx + half, cy + half)],
+                                        self.__hex(fill),
+                                        self.__hex(stroke),
+                                        self.__parameters()['stroke_width'])
+
+        # a circle looks the same at any rotation
+        key = ('circle', size, fill, stroke, self.__parameters()['stroke_width'])
+        sprite = self.__sprites.get(key)
+        if sprite is None:
+            with self.__timed('rasterize'):
+                image = Image.new('RGBA', size)
+                draw = ImageDraw.Draw(image)
+                draw.ellipse((0, 0, size[0], size[1]), fill=fill, outline=stroke, width=self.__parameters()['stroke_width'])
+                sprite = Sprite(image)
+            self.__sprites.put(key, sprite)
+
+        return self.__renderer.sprite(sprite, cx, cy, 'center')
 
     # create rectangle
     def rect(self, x1, y1, x2, y2, **kwargs):
-        points = self.transform_coords([[x1, y1], [x2, y2]])
-        dx, dy = (x2 - x1), (y2 - y1)
-
-        if self.app.useBounds:
-            dx *= self.app.scale_x
-            dy *= self.app.scale_y
-
-        cx, cy = map(lambda p: math.floor(sum(p) / 2), zip(*map(lambda p: (p[0], p[1]), points)))
+        (cx, cy), = self.transform_coords([((x1 + x2) / 2, (y1 + y2) / 2)])
+        cx, cy = math.floor(cx), math.floor(cy)
+        # corners around the center, turned, scaled and sheared like
+        # the coordinates
+        a, b, _, d, e, _ = self.__coefficients
+        dx, dy = (x2 - x1) / 2, (y2 - y1) / 2
+        corners = [(a * x + b * y, d * x + e * y)
+                   for x, y in ((-dx, -dy), (dx, -dy), (dx, dy), (-dx, dy))]
 
         alpha = int(kwargs.get('alpha', 1) * 255)
         bgAlpha = alpha
@@ -252,38 +472,63 @@ class Canvas:
 
         fill = ImageColor.getrgb(fill_color) + (bgAlpha,)
         stroke = ImageColor.getrgb(stroke_color) + (alpha,)
-        image = Image.new('RGBA', (math.floor(dx), math.floor(dy)))
-        draw = ImageDraw.Draw(image)
-        draw.rectangle((0, 0, dx, dy), fill=fill, outline=stroke, width=self.__parameters()['stroke_width'])
-        rotated_image = image.rotate(-self.__parameters()['rotate_deg'], expand=True)
-        self.__alpha_shapes.append(ImageTk.PhotoImage(rotated_image))
 
-        return self.handle.create_image(cx, cy,
-                                        image=self.__alpha_shapes[-1],
-                                        anchor='center')
+        if self.__native(alpha):
+            return self.__renderer.polygon([(x + cx, y + cy) for x, y in corners],
+                                           self.__hex(fill),
+                                           self.__hex(stroke),
+                                           self.__parameters()['stroke_width'])
+
+        key = ('rect', dx, dy, fill, stroke, self.__parameters()['stroke_width'], a, b, d, e)
+        sprite = self.__sprites.get(key)
+        if sprite is None:
+            with self.__timed('rasterize'):
+                w = math.floor(2 * (abs(a * dx) + abs(b * dy)))
+                h = math.floor(2 * (abs(d * dx) + abs(e * dy)))
+                image = Image.new('RGBA', (w, h))
+                draw = ImageDraw.Draw(image)
+                draw.polygon([(x + w / 2, y + h / 2) for x, y in corners],
+                             fill=fill, outline=stroke, width=self.__parameters()['stroke_width'])
+                sprite = Sprite(image)
+            self.__sprites.put(key, sprite)
+
+        return self.__renderer.sprite(sprite, cx, cy, 'center')
 
 
     # create line
-    # this method accepts two types of .
-    # 1) starting and ending X & Ys
-    # 2) two vectors
-    @dispatch(object, object, object, object)
-    def line(self, x1, y1, x2, y2):
-        return self.handle.create_line(self.transform_coords([
-                                        [x1, y1],
-                                        [x2, y2]]),
-                                        fill = self.__parameters()['stroke_color'],
-                                        width = self.__parameters()['stroke_width'])
-    @dispatch(Vector.Vector)
-    def line(self, v):
-        return self.line(0, 0, int(v.x), int(v.y))
-    @dispatch(Vector.Vector, Vector.Vector)
-    def line(self, v1, v2):
-        return self.line(int(v1.x), int(v1.y), int(v2.x), int(v2.y))
-
-    # draw triangle on canvas using customShape
-    @dispatch(object, object, object, object, object, object)
-    def triangle(self, x1, y1, x2, y2, x3, y3):
+    # this method accepts three types of arguments.
+    # 1) starting and ending X & Ys: line(x1, y1, x2, y2)
+    # 2) two vectors: line(v1, v2)
+    # 3) a vector, starting at the origin: line(v)
+    def line(self, x1, y1 = None, x2 = None, y2 = None):
+        if x2 is None:
+            if y1 is None:
+                x1, y1, x2, y2 = 0, 0, int(x1.x), int(x1.y)
+            else:
+                x1, y1, x2, y2 = int(x1.x), int(x1.y), int(y1.x), int(y1.y)
+        return self.__renderer.line(self.transform_coords(((x1, y1), (x2, y2))),
+                                    self.__parameters()['stroke_color'],
+                                    self.__parameters()['stroke_width'])
+
+    # draw a path through points, an (N, 2) array or a list of (x, y) pairs
+    # or vectors, as a single line. closed joins the last point to the first.
+    # stroke and stroke_width override the current stroke for this path.
+    def polyline(self, points, closed = False, **kwargs):
+        points = self.transform_coords(self.__batch_points(points))
+        if len(points) < 2:
+            return None
+        coords = list(map(tuple, points.tolist()))
+        if closed:
+            coords.append(coords[0])
+        return self.__renderer.line(coords,
+                                    kwargs.get('stroke', self.__parameters()['stroke_color']),
+                                    kwargs.get('stroke_width', self.__parameters()['stroke_width']))
+
+    # draw triangle on canvas using customShape.
+    # accepts six coordinates or three vectors
+    def triangle(self, x1, y1, x2, y2 = None, x3 = None, y3 = None):
+        if isinstance(x1, Vector.Vector):
+            x1, y1, x2, y2, x3, y3 = x1.x, x1.y, y1.x, y1.y, x2.x, x2.y
         tmp = self.__vertices
         self.begin_shape()
         self.vertex(x1, y1)
@@ -292,20 +537,152 @@ class Canvas:
         obj = self.end_shape()
         self.__vertices = tmp
         return obj
-    @dispatch(Vector.Vector, Vector.Vector, Vector.Vector)
-    def triangle(self, v1, v2, v3):
-        return self.triangle(v1.x, v1.y,
-                             v2.x, v2.y,
-                             v3.x, v3.y)
 
     # draw arc on canvas
     def arc(self, x1, y1, x2, y2, start, extend):
-        return self.handle.create_arc(self.transform_coords([[x1, y1], [x2, y2]]),
-                                      extent = extend,
-                                      start = -start,
-                                      style = tk.ARC,
-                                      outline = self.__parameters()['stroke_color'],
-                                      width = self.__parameters()['stroke_width'])
+        return self.__renderer.arc(self.transform_coords([[x1, y1], [x2, y2]]),
+                                   -start,
+                                   extend,
+                                   self.__parameters()['stroke_color'],
+                                   self.__parameters()['stroke_width'])
+
+    # whether a shape of the given alpha is drawn as a vector item
+    # instead of an image. the framebuffer pastes cached sprites faster
+    # than it draws shapes, so only tk items are native by default.
+    def __native(self, alpha):
+        if self.__shape_mode == 'auto':
+            return alpha >= 255 and self.__renderer_name == 'tk'
+        return self.__shape_mode == 'native'
+
+    # tkinter color of an RGBA tuple, '' when fully transparent
+    def __hex(self, rgba):
+        if rgba[3] == 0:
+            return ''
+        return '#%02x%02x%02x' % rgba[:3]
+
+    # batch drawing: many shapes are transformed together and rasterized
+    # into one transparent layer, which is put on the canvas as a single
+    # image. colors can be one color for all shapes or one per shape.
+
+    # draw circles at centers, an (N, 2) array or a list of (x, y) pairs or
+    # vectors. radii is one radius or one per circle, colors default to the
+    # fill color.
+    def circles(self, centers, radii, colors = None, **kwargs):
+        centers = self.transform_coords(self.__batch_points(centers))
+        count = len(centers)
+        radii = np.broadcast_to(np.asarray(radii, dtype = float) * self.__scale(), (count,))
+        fills = self.__batch_colors(self.__parameters()['fill_color'] if colors is None else colors, count)
+        stroke = self.__batch_stroke()
+        width = self.__parameters()['stroke_width']
+        boxes = np.column_stack((centers - radii[:, None], centers + radii[:, None]))
+
+        def paint(draw, left, top):
+            for box, fill in zip((boxes - (left, top, left, top)).tolist(), fills):
+                draw.ellipse(box, fill = fill, outline = fill if stroke is None else stroke, width = width)
+
+        return self.__draw_batch(boxes, paint, kwargs.get('alpha', 1))
+
+    # draw rectangles given as an (N, 4) array or a list of (x1, y1, x2, y2).
+    # colors default to the fill color.
+    def rects(self, rects, colors = None, **kwargs):
+        rects = self.__batch_points(rects, 4)
+        count = len(rects)
+        # the four corners of every rectangle
+        quads = self.transform_coords(rects[:, [0, 1, 2, 1, 2, 3, 0, 3]].reshape(-1, 2)).reshape(count, 8)
+        fills = self.__batch_colors(self.__parameters()['fill_color'] if colors is None else colors, count)
+        stroke = self.__batch_stroke()
+        width = self.__parameters()['stroke_width']
+        xs, ys = quads[:, 0::2], quads[:, 1::2]
+        boxes = np.column_stack((xs.min(1), ys.min(1), xs.max(1) + 1, ys.max(1) + 1))
+
+        def paint(draw, left, top):
+            for quad, fill in zip((quads - (left, top) * 4).tolist(), fills):
+                draw.polygon(quad, fill = fill, outline = fill if stroke is None else stroke, width = width)
+
+        return self.__draw_batch(boxes, paint, kwargs.get('alpha', 1))
+
+    # draw line segments given as an (N, 4) array or a list of (x1, y1, x2, y2).
+    # colors default to the stroke color, widths to the stroke width.
+    def lines(self, segments, colors = None, widths = None, **kwargs):
+        segments = self.__batch_points(segments, 4)
+        count = len(segments)
+        segments = self.transform_coords(segments.reshape(-1, 2)).reshape(count, 4)
+        colors = self.__batch_colors(self.__parameters()['stroke_color'] if colors is None else colors, count)
+        widths = np.broadcast_to(np.asarray(self.__parameters()['stroke_width'] if widths is None else widths,
+                                            dtype = float),
+                                 (count,))
+        pad = widths / 2 + 1
+        boxes = np.column_stack((np.minimum(segments[:, 0], segments[:, 2]) - pad,
+                                 np.minimum(segments[:, 1], segments[:, 3]) - pad,
+                                 np.maximum(segments[:, 0], segments[:, 2]) + pad,
+                                 np.maximum(segments[:, 1], segments[:, 3]) + pad))
+
+        def paint(draw, left, top):
+            for segment, color, width in zip((segments - (left, top, left, top)).tolist(), colors, widths.tolist()):
+                draw.line(segment, fill = color, width = round(width))
+
+        return self.__draw_batch(boxes, paint, kwargs.get('alpha', 1))
+
+    # an (N, columns) float array from an array, a VectorArray, a list of tuples or vectors
+    def __batch_points(self, points, columns = 2):
+        if isinstance(points, Vector.VectorArray):
+            points = points.data
+        elif len(points) and isinstance(points[0], Vector.Vector):
+            points = [(v.x, v.y) for v in points]
+        points = np.asarray(points, dtype = float)
+        if points.size % columns:
+            raise ValueError('Expected %d values per shape.' % columns)
+        return points.reshape(-1, columns)
+
+    # a color name, '' for none, or (r, g, b) values as an RGB tuple
+    def __batch_color(self, color):
+        if isinstance(color, str):
+            return ImageColor.getrgb(color)[:3] if color != '' else None
+        return tuple(int(v) for v in color[:3])
+
+    # one RGB tuple per shape
+    def __batch_colors(self, colors, count):
+        # a single color is a name or a sequence of numbers, never a list of names
+        if isinstance(colors, str) or (len(colors) in (3, 4) and np.isscalar(colors[0])
+                                       and not isinstance(colors[0], str)):
+            return [self.__batch_color(colors)] * count
+        if len(colors) != count:
+            raise ValueError('Expected one color per shape, got %d colors for %d shapes.' % (len(colors), count))
+        names = {}
+        result = []
+        for color in colors:
+            if isinstance(color, str):
+                if color not in names:
+                    names[color] = self.__batch_color(color)
+                result.append(names[color])
+            else:
+                result.append(self.__batch_color(color))
+        return result
+
+    # outline color of batched shapes, None when the stroke is disabled
+    def __batch_stroke(self):
+        if self.__parameters()['stroke_disabled']:
+            return None
+        return self.__batch_color(self.__parameters()['stroke_color'])
+
+    # rasterize a batch on a layer covering the screen boxes (N, 4) of its
+    # shapes. paint(draw, left, top) draws the shapes offset by the layer position.
+    def __draw_batch(self, boxes, paint, alpha):
+        if len(boxes) == 0:
+            return None
+        left = max(math.floor(boxes[:, 0].min()), 0)
+        top = max(math.floor(boxes[:, 1].min()), 0)
+        right = min(math.ceil(boxes[:, 2].max()) + 1, self.__width)
+        bottom = min(math.ceil(boxes[:, 3].max()) + 1, self.__height)
+        if left >= right or top >= bottom:
+            return None
+        with self.__timed('rasterize'):
+            layer = Image.new('RGBA', (right - left, bottom - top))
+            paint(ImageDraw.Draw(layer), left, top)
+            # shapes are drawn opaque and faded as a group
+            if alpha < 1:
+                layer.putalpha(layer.getchannel('A').point(lambda v: int(v * alpha)))
+        return self.__renderer.image(layer, left, top, 'nw')
 
     # create polygons
     def begin_shape(self):
@@ -316,125 +693,241 @@ class Canvas:
 
     def end_shape(self, **kwargs):
         if len(self.__vertices) > 1:
-            # get polygon bounding box
-            xs = [x[0] for x in self.__vertices]
-            ys = [y[1] for y in self.__vertices]
-            w = max(xs) * 3
-            h = max(ys) * 3
-
-            cx = self.__parameters()['center_x']
-            cy = self.__parameters()['center_y']
-            
-            if self.app.useBounds:
-                w = self.__width
-                h = self.__height
-                cx = self.app.bound_center[0]
-                cy = self.app.bound_center[1]
-
-            size = (max(w, h), max(w, h))
-            offset = None if self.app.useBounds else (size[0] // 2, size[1] // 2)
+            # polygon bounding box on screen, cut to the canvas
+            points = self.transform_coords(np.array(self.__vertices, dtype = float))
+            left = max(math.floor(points[:, 0].min()), 0)
+            top = max(math.floor(points[:, 1].min()), 0)
+            right = min(math.ceil(points[:, 0].max()) + 1, self.__width)
+            bottom = min(math.ceil(points[:, 1].max()) + 1, self.__height)
+            if left >= right or top >= bottom:
+                return None
 
             # set width and height of polygon
             alpha = int(kwargs.get('alpha', 1) * 255)
             bgAlpha = alpha
 
             if (self.__parameters()['fill_color'] == ''):
-                self.__parameters()['fill_color'] = '#000'
+                self.__set('fill_color', '#000')
                 bgAlpha = 0
 
             fill = ImageColor.getrgb(self.__parameters()['fill_color']) + (bgAlpha,)
 
             if self.__parameters()['stroke_disabled']:
-                self.__parameters()['stroke_color'] = self.__parameters()['fill_color']
+                self.__set('stroke_color', self.__parameters()['fill_color'])
             
             stroke = ImageColor.getrgb(self.__parameters()['stroke_color']) + (alpha,)
-            
-            image = Image.new('RGBA', size)
-            draw = ImageDraw.Draw(image)
 
-            draw.polygon(self.transform_coords(self.__vertices, offset),
-                        fill = fill,
-                        outline = stroke)
+            if self.__native(alpha):
+                return self.__renderer.polygon(list(map(tuple, points.tolist())),
+                                               self.__hex(fill),
+                                               self.__hex(stroke),
+                                               1)
+            
+            # the image covers the bounding box only
+            with self.__timed('rasterize'):
+                image = Image.new('RGBA', (right - left, bottom - top))
+                draw = ImageDraw.Draw(image)
 
-            self.__alpha_shapes.append(ImageTk.PhotoImage(image))
+                draw.polygon((points - (left, top)).ravel().tolist(),
+                            fill = fill,
+                            outline = stroke)
 
-            return self.handle.create_image(cx, cy,
-                                            image = self.__alpha_shapes[-1],
-                                            anchor = 'center')
+            return self.__renderer.image(image, left, top, 'nw')
 
     def font_family(self, family):
-        self.__parameters()['font_family'] = family
+        self.__set('font_family', family)
 
     def font_color(self, color):
-        self.__parameters()['font_color'] = color
+        self.__set('font_color', color)
 
     # set text anchor point
     # nw, n, ne, center, sw, s, se
     def text_anchor(self, anchor):
-        self.__parameters()['text_anchor'] = anchor
+        self.__set('text_anchor', anchor)
 
     # put text on canvas
     def text(self, x, y, text):
-        return self.handle.create_text(self.transform_coords([[x, y]]),
-                                       fill = self.__parameters()['font_color'],
-                                       font = self.__parameters()['font_family'],
-                                       angle = -self.__parameters()['text_rotate_deg'],
-                                       anchor = self.__parameters()['text_anchor'],
-                                       text = text)
-
-    # set a pixel
-    @dispatch(object, object, object)
-    def point(self, x, y, color):
+        tx, ty = self.transform_coords([[x, y]])[0]
+        return self.__renderer.text(tx, ty, str(text),
+                                    self.__parameters()['font_color'],
+                                    self.__parameters()['font_family'],
+                                    -self.__transforms[-1].text_rotate_deg,
+                                    self.__parameters()['text_anchor'])
+
+    # bounding box (x1, y1, x2, y2) the text would occupy on screen
+    def text_bbox(self, x, y, text):
+        tx, ty = self.transform_coords([[x, y]])[0]
+        return self.__renderer.text_bbox(tx, ty, str(text),
+                                         self.__parameters()['font_family'],
+                                         self.__parameters()['text_anchor'])
+
+    # set a pixel, at x, y or at a vector: point(v, color).
+    # use points() for many pixels at once
+    def point(self, x, y, color = None):
+        if isinstance(x, Vector.Vector):
+            x, y, color = x.x, x.y, y
+        # optional in the signature only because of the vector form
+        if color is None:
+            raise TypeError("point() missing required argument: 'color'")
         for point_x, point_y in self.transform_coords([[x, y]]):
             if point_x >= 0 and point_y >= 0:
-                return self.handle.create_line(self.transform_coords([
-                                        [x, y],
-                                        [x + 1, y + 1]]),
-                                        fill = color)
-    @dispatch(Vector.Vector, object)
-    def point(self, v, color):
-        return self.point(v.x, v.y, color)
-
-    # get RGB value of a pixel
+                return self.__renderer.point(point_x, point_y, color)
+
+    # set many pixels at once. xs and ys are canvas coordinates, colors is
+    # one color or one per point, as names or (r, g, b) values.
+    # the points are kept in the pixel buffer and drawn over the frame.
+    def points(self, xs, ys, colors = 'white'):
+        points = self.transform_coords(np.column_stack((np.asarray(xs, dtype = float).ravel(),
+                                                        np.asarray(ys, dtype = float).ravel())))
+        # a frame may have nothing to plot
+        if len(points) == 0:
+            return
+        points = np.floor(points).astype(np.intp)
+        if isinstance(colors, np.ndarray) and colors.ndim == 2:
+            rgb = colors[:, :3]
+        else:
+            rgb = np.array(self.__batch_colors(colors, len(points)), dtype = np.uint8).reshape(-1, 3)
+        inside = ((points[:, 0] >= 0) & (points[:, 0] < self.__width) &
+                  (points[:, 1] >= 0) & (points[:, 1] < self.__height))
+        pixels = self.pixels()
+        x, y = points[inside, 0], points[inside, 1]
+        pixels[y, x, :3] = rgb[inside] if len(rgb) > 1 else rgb[0]
+        pixels[y, x, 3] = 255
+
+    # writable (height, width, 4) RGBA array of the pixel buffer, indexed by
+    # screen position as [y, x]. pixels with zero alpha are transparent.
+    def pixels(self):
+        if self.__pixels is None:
+            self.__pixels = np.zeros((self.__height, self.__width, 4), dtype = np.uint8)
+        self.__pixels_changed = True
+        return self.__pixels
+
+    # draw the pixel buffer over the frame if it has changed,
+    # replacing the image showing it before
+    def __flush_pixels(self):
+        if not self.__pixels_changed:
+            return
+        self.__pixels_changed = False
+        # a copy, so the frame drawn keeps its pixels while the buffer changes
+        image = Image.fromarray(self.__pixels.copy(), 'RGBA')
+        self.__pixel_layer = self.__draw_layer('image', image, 0, 0, self.__pixel_layer)
+
+    # draw an image or sprite at a screen position, in place of the one the
+    # layer showed before, and return what shows it now: the recorded
+    # commands on a retained canvas, else the tkinter item
+    def __draw_layer(self, method, source, x, y, layer):
+        renderer = self.__renderer
+        if self.__retained:
+            renderer.replacing = []
+            try:
+                getattr(renderer, method)(source, x, y, 'nw')
+            finally:
+                commands = renderer.replacing
+                renderer.replacing = None
+            renderer.replace(layer or [], commands)
+            return commands
+        if layer is not None:
+            renderer.delete(layer)
+        return getattr(renderer, method)(source, x, y, 'nw')
+
+    # draw an RGBA image at a screen position, ignoring the transformation,
+    # in place of the overlay drawn before. the image is converted for
+    # tkinter once, so drawing the same image object again every frame is
+    # cheap, which suits a HUD that changes a few times per second.
+    def overlay(self, image, x = 0, y = 0):
+        self.__flush_pixels()
+        if self.__overlay_sprite is None or self.__overlay_sprite.image is not image:
+            self.__overlay_sprite = Sprite(image)
+        self.__overlay_layer = self.__draw_layer('sprite', self.__overlay_sprite, x, y, self.__overlay_layer)
+
+    # get RGB value of a pixel, relative to the canvas origin.
+    # pixels are read from the rendered frame; with the tk renderer
+    # capturing starts on the first call unless capture is enabled.
     def get_pixel(self, x, y):
-        x += self.__parameters()['center_x']
-        y += self.__parameters()['center_y']
-        try:
-            im = self.__pack()
-            rgb_im = im.convert('RGB')
-            r, g, b = rgb_im.getpixel((x, y))
-            return (r, g, b)
-        except:
+        pixels = self.get_pixels(x, y, 1, 1)
+        if pixels.size == 0:
             return (0, 0, 0)
+        r, g, b = pixels[0, 0].tolist()
+        return (r, g, b)
+
+    # RGB values of a w x h region starting at x, y relative to the canvas
+    # origin, as a (h, w, 3) array. parts outside the canvas are cut off.
+    def get_pixels(self, x, y, w, h):
+        self.__capture()
+        self.__flush_pixels()
+        self.__renderer.flush()
+        cx, cy = self.get_center_pos()
+        x1 = max(math.floor(x + cx), 0)
+        y1 = max(math.floor(y + cy), 0)
+        x2 = min(math.floor(x + cx) + w, self.__width)
+        y2 = min(math.floor(y + cy) + h, self.__height)
+        return np.asarray(self.__framebuffer.buffer.crop((x1, y1, max(x1, x2), max(y1, y2))))
 
     def image_anchor(self, anchor):
-        self.__parameters()['image_anchor'] = anchor
+        self.__set('image_anchor', anchor)
+
+    # load an image from path and draw it on canvas,
+    # at x, y or at a vector: create_image(v, source).
+    # files are decoded once and kept in the asset cache together with
+    # their scaled and rotated versions, until the file changes.
+    def create_image(self, x, y, source = None, **kwargs):
+        if isinstance(x, Vector.Vector):
+            x, y, source = x.x, x.y, y
 
-    # load an image from path and draw it on canvas
-    @dispatch(object, object, object)
-    def create_image(self, x, y, source, **kwargs):
-        try:
-            im = Image.open(source)
-        except:
-            im = source
-        
         scale = kwargs.get('scale', None)
-        if scale is not None:
-            width, height = im.size
-            newWidth = math.floor(width * scale)
-            newheight = math.floor(height * scale)
-            im = im.resize((newWidth, newheight))
-
-        self.__alpha_shapes.append(ImageTk.PhotoImage(im.rotate(-self.__parameters()['rotate_deg'], expand = True)))
-        return self.handle.create_image(self.transform_coords([[x, y]]),
-                                        image = self.__alpha_shapes[-1],
-                                        anchor = self.__parameters()['image_anchor'])
-    @dispatch(Vector.Vector, object)
-    def create_image(self, v, source, **kwargs):
-        return self.create_image(v.x, v.y, source, **kwargs)
+        deg = self.__transforms[-1].rotate_deg
+        tx, ty = self.transform_coords([[x, y]])[0]
+        anchor = self.__parameters()['image_anchor']
+
+        key = self.__asset_key(source)
+        if key is None:
+            # images and file objects are not cached
+            try:
+                im = Image.open(source)
+            except:
+                im = source
+            return self.__renderer.image(self.__transform_image(im, scale, deg), tx, ty, anchor)
+
+        sprite = self.__assets.get(key + (scale, deg))
+        if sprite is None:
+            sprite = Sprite(self.__transform_image(self.__load_image(source, key), scale, deg))
+            self.__assets.put(key + (scale, deg), sprite)
+        return self.__renderer.sprite(sprite, tx, ty, anchor)
+
+    # decode image files ahead of time, e.g. in setup
+    def preload(self, *paths):
+        for path in paths:
+            self.__load_image(path, self.__asset_key(path))
+
+    # cache key of an image file, None for other sources
+    def __asset_key(self, source):
+        if not isinstance(source, (str, os.PathLike)):
+            return None
+        return ('image', os.fspath(source), os.stat(source).st_mtime_ns)
+
+    # decoded image of a file, from the asset cache if possible
+    def __load_image(self, path, key):
+        im = self.__assets.get(key)
+        if im is None:
+            im = Image.open(path)
+            im.load()
+            self.__assets.put(key, im)
+        return im
+
+    def __transform_image(self, im, scale, deg):
+        with self.__timed('rasterize'):
+            if scale is not None:
+                width, height = im.size
+                newWidth = math.floor(width * scale)
+                newheight = math.floor(height * scale)
+                im = im.resize((newWidth, newheight))
+            return im.rotate(-deg, expand = True)
 
     # check if specific items have collided
     def check_overlap(self, items):
+        if self.handle is None:
+            return False
+        items = [i for target in items for i in self.__items(target)]
         bounds = self.handle.bbox(items[0])
         overlapping = self.handle.find_overlapping(bounds[0], bounds[1], bounds[2], bounds[3])
         return all(item in overlapping for item in items)
@@ -444,20 +937,71 @@ class Canvas:
         return self.__hist[-1]
 
     def send_to_back(self, item):
-        self.handle.tag_lower(item)
+        if isinstance(item, Shape):
+            self.__renderer.reorder(item.commands, front = False)
+        if self.handle is None:
+            return
+        for i in self.__items(item):
+            self.handle.tag_lower(i)
 
     def bring_to_front(self, item):
-        self.handle.tag_raise(item)
+        if isinstance(item, Shape):
+            self.__renderer.reorder(item.commands, front = True)
+        if self.handle is None:
+            return
+        for i in self.__items(item):
+            self.handle.tag_raise(i)
+
+    # change a parameter of the current level,
+    # copying the parameters first if they are shared
+    def __set(self, key, value):
+        if not self.__owned[-1]:
+            self.__hist[-1] = self.__hist[-1].copy()
+            self.__owned[-1] = True
+        self.__hist[-1][key] = value
+
+    # change the transformation of the current level
+    def __transform(self, **changes):
+        self.__transforms[-1] = self.__transforms[-1]._replace(**changes)
 
     # push current parameters
     def push(self):
-        self.__hist.append(self.__parameters().copy())
+        self.__hist.append(self.__hist[-1])
+        self.__owned.append(False)
+        self.__transforms.append(self.__transforms[-1])
 
     # pop last parameters
     def pop(self):
         if len(self.__hist) == 1:
             raise Exception('Cannot go back any further. List is empty!')
         self.__hist.pop()
+        self.__owned.pop()
+        self.__transforms.pop()
+
+    # compose an affine matrix with the current one. shapes are transformed
+    # by the last applied matrix first, so nested parts are drawn in the
+    # coordinates of their parent:
+    #   x' = a * x + b * y + c
+    #   y' = d * x + e * y + f
+    # a 3x3 matrix can be given instead of the six values.
+    def apply_matrix(self, a, b = None, c = None, d = None, e = None, f = None):
+        if b is None:
+            m = np.asarray(a, dtype = float)
+            if m.shape != (3, 3):
+                raise ValueError('Expected a 3x3 matrix or six values.')
+            a, b, c, d, e, f = m[:2].ravel().tolist()
+        A, B, C, D, E, F = self.__transforms[-1].matrix
+        self.__transform(matrix = (A * a + B * d, A * b + B * e, A * c + B * f + C,
+                                   D * a + E * d, D * b + E * e, D * c + E * f + F))
+
+    # discard the matrices applied since the last reset
+    def reset_matrix(self):
+        self.__transform(matrix = IDENTITY)
+
+    # the current matrix as a 3x3 array
+    def get_matrix(self):
+        a, b, c, d, e, f = self.__transforms[-1].matrix
+        return np.array([[a, b, c], [d, e, f], [0.0, 0.0, 1.0]])
 
     # draw grid on screen.
     # requires boundaries to be set first
@@ -466,10 +1010,9 @@ class Canvas:
             self.push()
             self.stroke('#333')
             self.stroke_width(1)
-            self.handle.create_rectangle(0, 0,
-                                         self.__width, self.__height,
-                                         fill=self.app.bg_color,
-                                         outline=self.app.bg_color)
+            self.__renderer.rectangle([(0, 0), (self.__width, self.__height)],
+                                      self.app.bg_color,
+                                      self.app.bg_color)
 
             for i in range(self.app.bounds[0], self.app.bounds[2] + 1):
                 self.line(i, self.app.bounds[1], i, self.app.bounds[3])
@@ -481,6 +1024,15 @@ class Canvas:
 
     # clear canvas
     def clear(self, target):
-        self.handle.delete(target)
+        if target == 'all':
+            self.__renderer.clear()
+            if self.__pixels is not None:
+                self.__pixels.fill(0)
+            self.__pixel_layer = None
+            self.__overlay_layer = None
+        elif isinstance(target, Shape):
+            target.remove()
+        elif self.handle is not None:
+            self.handle.delete(target)
         if self.__showGrid:
             self.showGrid()
@@ -0,0 +1,243 @@
+import collections
+import fractions
+import io
+import multiprocessing
+import os
+import struct
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from PIL import Image, GifImagePlugin
+
+
+# encoders run in worker processes, so they are plain module level
+# functions receiving raw RGB bytes.
+
+def _gif_frame(size, data, duration, first):
+    frame = Image.frombytes('RGB', size, data).convert('P', palette = Image.Palette.ADAPTIVE)
+    blocks = []
+    if first:
+        header, _ = GifImagePlugin.getheader(frame, info = {'loop': 0})
+        blocks.extend(header)
+    # every frame carries its own color table
+    blocks.extend(GifImagePlugin.getdata(frame,
+                                         duration = duration,
+                                         include_color_table = True))
+    return b''.join(blocks)
+
+def _png_chunks(size, data):
+    buffer = io.BytesIO()
+    Image.frombytes('RGB', size, data).save(buffer, format = 'PNG')
+    data = buffer.getvalue()
+    pos = 8
+    chunks = []
+    while pos < len(data):
+        length, = struct.unpack('>I', data[pos:pos + 4])
+        chunks.append((data[pos + 4:pos + 8], data[pos + 8:pos + 8 + length]))
+        pos += length + 12
+    return chunks
+
+def _png_file(size, data, path):
+    Image.frombytes('RGB', size, data).save(path, format = 'PNG')
+    return path
+
+def _y4m_frame(size, data):
+    planes = Image.frombytes('RGB', size, data).convert('YCbCr').split()
+    return b'FRAME\n' + b''.join(p.tobytes() for p in planes)
+
+
+# worker processes are forked so they do not re-run the sketch script,
+# which starts the app at module level. where forking is unavailable or
+# unsafe (windows, macOS) threads are used; PIL releases the GIL while
+# compressing.
+def create_executor(workers = None):
+    workers = workers or os.cpu_count() or 1
+    if 'fork' in multiprocessing.get_all_start_methods() and sys.platform != 'darwin':
+        return ProcessPoolExecutor(max_workers = workers,
+                                   mp_context = multiprocessing.get_context('fork'))
+    return ThreadPoolExecutor(max_workers = workers)
+
+
+# base class of pooled writers: frames are encoded by a pool of workers
+# and the results are consumed in order. the number of frames in flight
+# is bounded, so memory use stays constant.
+class FrameWriter:
+    def __init__(self, path, fps, workers = None):
+        self.path        = path
+        self.fps         = fps
+        self.count       = 0
+        self.__executor  = create_executor(workers)
+        self.__pending   = collections.deque()
+        self.__limit     = 2 * (workers or os.cpu_count() or 1)
+
+    # schedule the encoding of a frame
+    def encode(self, image, index):
+        raise NotImplementedError
+
+    # write the encoded result of a frame, called in frame order
+    def consume(self, result, index):
+        pass
+
+    def submit(self, fn, *args):
+        return self.__executor.submit(fn, *args)
+
+    def write(self, image):
+        image = image.convert('RGB')
+        self.__pending.append((self.count, self.encode(image, self.count)))
+        self.count += 1
+        self.__flush(len(self.__pending) > self.__limit)
+
+    # consume finished frames, optionally waiting for the oldest one
+    def __flush(self, wait):
+        while self.__pending and (wait or self.__pending[0][1].done()):
+            index, future = self.__pending.popleft()
+            self.consume(future.result(), index)
+            wait = False
+
+    def finish(self):
+        pass
+
+    def close(self):
+        while self.__pending:
+            self.__flush(True)
+        self.__executor.shutdown()
+        self.finish()
+
+
+# writes frames to an animated GIF file
+class GifWriter(FrameWriter):
+    def __init__(self, path, fps, workers = None):
+        super().__init__(path, fps, workers)
+        self.__file = open(path, 'wb')
+
+    def encode(self, image, index):
+        # gif delays are whole hundredths of a second
+        return self.submit(_gif_frame, image.size, image.tobytes(), round(1000 / self.fps), index == 0)
+
+    def consume(self, result, index):
+        self.__file.write(result)
+
+    def finish(self):
+        if self.count > 0:
+            # trailer
+            self.__file.write(b';')
+        self.__file.close()
+
+
+# writes frames to an animated PNG file.
+# the frame count is patched into the header when the file is closed.
+class ApngWriter(FrameWriter):
+    SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+    def __init__(self, path, fps, workers = None):
+        super().__init__(path, fps, workers)
+        # frame delay as a fraction of 16 bit integers
+        self.__delay     = (1 / fractions.Fraction(fps)).limit_denominator(0xffff)
+        self.__sequence  = 0
+        self.__actl_pos  = None
+        self.__file      = open(path, 'wb')
+
+    def __chunk(self, kind, data):
+        self.__file.write(struct.pack('>I', len(data)) + kind + data +
+                          struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+    def encode(self, image, index):
+        if index == 0:
+            self.__width, self.__height = image.size
+        elif image.size != (self.__width, self.__height):
+            raise ValueError('All frames of an APNG file must have the same size!')
+        return self.submit(_png_chunks, image.size, image.tobytes())
+
+    def consume(self, chunks, index):
+        if index == 0:
+            self.__file.write(self.SIGNATURE)
+            self.__chunk(b'IHDR', dict(chunks)[b'IHDR'])
+            self.__actl_pos = self.__file.tell()
+            self.__chunk(b'acTL', struct.pack('>II', 0, 0))
+
+        # frame control: size, offset, delay of 1 / fps seconds,
+        # no disposal and no blending
+        self.__chunk(b'fcTL', struct.pack('>IIIIIHHBB',
+                                          self.__sequence,
+                                          self.__width, self.__height,
+                                          0, 0,
+                                          self.__delay.numerator, self.__delay.denominator,
+                                          0, 0))
+        self.__sequence += 1
+        for kind, data in chunks:
+            if kind != b'IDAT':
+                continue
+            if index == 0:
+                self.__chunk(b'IDAT', data)
+            else:
+                self.__chunk(b'fdAT', struct.pack('>I', self.__sequence) + data)
+                self.__sequence += 1
+
+    def finish(self):
+        if self.count > 0:
+            self.__chunk(b'IEND', b'')
+            self.__file.seek(self.__actl_pos)
+            self.__chunk(b'acTL', struct.pack('>II', self.count, 0))
+        self.__file.close()
+
+
+# writes every frame to its own numbered PNG file.
+# the path is a pattern such as 'frames/%05d.png'
+class PngSequenceWriter(FrameWriter):
+    def encode(self, image, index):
+        return self.submit(_png_file, image.size, image.tobytes(), self.path % index)
+
+
+# writes frames to a YUV4MPEG2 stream (full range 4:4:4),
+# readable by ffmpeg and most offline encoders
+class Y4mWriter(FrameWriter):
+    def __init__(self, path, fps, workers = None):
+        super().__init__(path, fps, workers)
+        self.__file = open(path, 'wb')
+
+    def encode(self, image, index):
+        if index == 0:
+            rate = fractions.Fraction(self.fps).limit_denominator(1001)
+            self.__file.write(b'YUV4MPEG2 W%d H%d F%d:%d Ip A1:1 C444 XCOLORRANGE=FULL\n'
+                              % (image.width, image.height, rate.numerator, rate.denominator))
+        return self.submit(_y4m_frame, image.size, image.tobytes())
+
+    def consume(self, result, index):
+        self.__file.write(result)
+
+    def finish(self):
+        self.__file.close()
+
+
+# writes raw RGB24 frames back to back. frames need no encoding,
+# so they are written directly without the worker pool.
+class RawWriter:
+    def __init__(self, path, fps, workers = None):
+        self.path     = path
+        self.fps      = fps
+        self.count    = 0
+        self.__file   = open(path, 'wb')
+
+    def write(self, image):
+        self.__file.write(image.convert('RGB').tobytes())
+        self.count += 1
+
+    def close(self):
+        self.__file.close()
+
+
+# create a frame writer based on the file extension
+def create_writer(path, fps, workers = None):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.gif':
+        return GifWriter(path, fps, workers)
+    if ext == '.png' and '%' in path:
+        return PngSequenceWriter(path, fps, workers)
+    if ext in ('.png', '.apng'):
+        return ApngWriter(path, fps, workers)
+    if ext == '.y4m':
+        return Y4mWriter(path, fps, workers)
+    if ext in ('.rgb', '.raw'):
+        return RawWriter(path, fps, workers)
+    raise ValueError("unsupported export format '%s', expected .gif, .png, .apng, .y4m or .rgb" % ext)
@@ -0,0 +1,138 @@
+import json
+import marshal
+import os
+import time
+
+
+# canvas methods profiled by default
+PROFILED = ('circle', 'rect', 'line', 'end_shape', 'text',
+            'create_image', 'point', 'transform_coords')
+
+
+# counts the calls and measures the time of canvas methods.
+# the methods are wrapped on the canvas instance, so only the profiled
+# canvas pays for it. a profiled method called by another one, like
+# transform_coords inside circle, counts towards both: the outer method's
+# total time includes it, its own time does not.
+class Profiler:
+    def __init__(self, target, methods = PROFILED):
+        self.target    = target
+        self.methods   = tuple(methods)
+        # name: [calls, outermost calls, own seconds, total seconds, {caller: same four}]
+        self.__totals  = {name: [0, 0, 0.0, 0.0, {}] for name in self.methods}
+        # name: [calls, total seconds] of the current frame
+        self.__current = {name: [0, 0.0] for name in self.methods}
+        self.__last    = {}
+        self.frames    = 0
+        # profiled calls in progress: [name, start, seconds of profiled calls inside]
+        self.__stack   = []
+        self.__depth   = {name: 0 for name in self.methods}
+        self.__original = {}
+        for name in self.methods:
+            self.__original[name] = target.__dict__.get(name)
+            setattr(target, name, self.__wrap(name, getattr(target, name)))
+
+    def __wrap(self, name, method):
+        def profiled(*args, **kwargs):
+            stack = self.__stack
+            call = [name, time.perf_counter(), 0.0]
+            stack.append(call)
+            self.__depth[name] += 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - call[1]
+                stack.pop()
+                self.__depth[name] -= 1
+                recursive = self.__depth[name] > 0
+                total = self.__totals[name]
+                total[0] += 1
+                total[2] += elapsed - call[2]
+                if not recursive:
+                    total[1] += 1
+                    total[3] += elapsed
+                    self.__current[name][1] += elapsed
+                self.__current[name][0] += 1
+                if stack:
+                    caller = stack[-1]
+                    caller[2] += elapsed
+                    entry = total[4].setdefault(caller[0], [0, 0, 0.0, 0.0])
+                    entry[0] += 1
+                    entry[2] += elapsed - call[2]
+                    if not recursive:
+                        entry[1] += 1
+                        entry[3] += elapsed
+        profiled.__name__ = name
+        profiled.__wrapped__ = method
+        return profiled
+
+    # restore the unprofiled methods
+    def remove(self):
+        for name, original in self.__original.items():
+            if original is None:
+                delattr(self.target, name)
+            else:
+                setattr(self.target, name, original)
+        self.__original = {}
+
+    # close the current frame, its numbers are then returned by last_frame()
+    def frame(self):
+        self.__last = {name: {'calls': calls, 'time_ms': seconds * 1000}
+                       for name, (calls, seconds) in self.__current.items()}
+        self.__current = {name: [0, 0.0] for name in self.methods}
+        self.frames += 1
+
+    # calls and milliseconds of every method in the last closed frame
+    def last_frame(self):
+        return self.__last
+
+    # calls and milliseconds of every method since profiling started.
+    # total_ms includes profiled methods called from inside, self_ms does not.
+    def stats(self):
+        result = {}
+        for name, (calls, _, own, total, _) in self.__totals.items():
+            result[name] = {'calls': calls,
+                            'total_ms': total * 1000,
+                            'self_ms': own * 1000,
+                            'per_call_us': total * 1e6 / calls if calls else 0.0,
+                            'per_frame_ms': total * 1000 / self.frames if self.frames else 0.0}
+        return result
+
+    # methods by total time, as a printable table
+    def report(self):
+        stats = sorted(self.stats().items(), key = lambda item: -item[1]['total_ms'])
+        lines = ['%-18s %10s %12s %12s %12s' % ('method', 'calls', 'total ms', 'self ms', 'us/call')]
+        for name, s in stats:
+            lines.append('%-18s %10d %12.2f %12.2f %12.2f' % (name, s['calls'], s['total_ms'],
+                                                              s['self_ms'], s['per_call_us']))
+        return '\n'.join(lines)
+
+    # (file, line, name) identifying a method in pstats
+    def __label(self, name):
+        code = getattr(getattr(type(self.target), name, None), '__code__', None)
+        if code is None:
+            return ('~', 0, name)
+        return (code.co_filename, code.co_firstlineno, code.co_name)
+
+    # statistics in the format of the profile and cProfile modules
+    def pstats(self):
+        result = {}
+        for name, (calls, primitive, own, total, callers) in self.__totals.items():
+            if calls == 0:
+                continue
+            result[self.__label(name)] = (primitive, calls, own, total,
+                                          {self.__label(caller): tuple(entry)
+                                           for caller, entry in callers.items()})
+        return result
+
+    # write the statistics to a .json file, or in pstats format to any
+    # other file, e.g. .prof, readable with pstats.Stats(path) and snakeviz
+    def dump(self, path):
+        if os.path.splitext(path)[1].lower() == '.json':
+            with open(path, 'w') as f:
+                json.dump({'frames': self.frames,
+                           'last_frame': self.__last,
+                           'stats': self.stats()}, f, indent = 2)
+        else:
+            with open(path, 'wb') as f:
+                marshal.dump(self.pstats(), f)
@@ -0,0 +1,711 @@
+import functools
+import itertools
+import math
+
+from PIL import Image, ImageTk, ImageDraw, ImageFont
+
+# maps tkinter anchor names to PIL text anchors
+TEXT_ANCHORS = {
+    'nw'    : 'la',
+    'n'     : 'ma',
+    'ne'    : 'ra',
+    'w'     : 'lm',
+    'center': 'mm',
+    'e'     : 'rm',
+    'sw'    : 'ld',
+    's'     : 'md',
+    'se'    : 'rd'
+}
+
+# top left corner of a (w, h) box placed at (x, y) using a tkinter anchor
+def anchor_position(anchor, x, y, w, h):
+    if anchor == 'center':
+        return (int(x - w // 2), int(y - h // 2))
+    if 'w' in anchor:
+        left = x
+    elif 'e' in anchor:
+        left = x - w
+    else:
+        left = x - w // 2
+    if 'n' in anchor:
+        top = y
+    elif 's' in anchor:
+        top = y - h
+    else:
+        top = y - h // 2
+    return (int(left), int(top))
+
+
+# a rasterized RGBA image that can be drawn many times.
+# the PhotoImage is created once, the first time it is drawn by tkinter.
+class Sprite:
+    def __init__(self, image):
+        self.image = image
+        self.photo = None
+
+
+# load a PIL font from a tkinter font description, e.g. 'Tahoma 20 bold'
+@functools.lru_cache(maxsize = None)
+def load_font(family):
+    parts = family.replace('{', '').replace('}', '').split()
+    sizes = [int(p) for p in parts if p.lstrip('-').isdigit()]
+    size = abs(sizes[0]) if sizes else 12
+    name = ' '.join(p for p in parts if not p.lstrip('-').isdigit()
+                    and p.lower() not in ('bold', 'italic', 'underline', 'overstrike', 'normal', 'roman'))
+    for candidate in (name + '.ttf', name.lower() + '.ttf', name):
+        try:
+            return ImageFont.truetype(candidate, size)
+        except (OSError, ValueError):
+            continue
+    return ImageFont.load_default(size)
+
+
+# draws every primitive as a separate tkinter canvas item
+class TkRenderer:
+    def __init__(self, handle):
+        self.handle = handle
+        # PhotoImages must be referenced while their items are alive
+        self.__photos = {}
+
+    def sprite(self, sprite, x, y, anchor):
+        if sprite.photo is None:
+            sprite.photo = ImageTk.PhotoImage(sprite.image)
+        item = self.handle.create_image(x, y,
+                                        image = sprite.photo,
+                                        anchor = anchor)
+        self.__photos[item] = sprite.photo
+        return item
+
+    def image(self, image, x, y, anchor):
+        return self.sprite(Sprite(image), x, y, anchor)
+
+    def line(self, coords, fill, width):
+        return self.handle.create_line(coords, fill = fill, width = width)
+
+    def arc(self, coords, start, extent, outline, width):
+        return self.handle.create_arc(coords,
+                                      start = start,
+                                      extent = extent,
+                                      style = 'arc',
+                                      outline = outline,
+                                      width = width)
+
+    def rectangle(self, coords, fill, outline):
+        return self.handle.create_rectangle(coords, fill = fill, outline = outline)
+
+    def oval(self, coords, fill, outline, width):
+        return self.handle.create_oval(coords, fill = fill, outline = outline, width = width)
+
+    def polygon(self, coords, fill, outline, width):
+        return self.handle.create_polygon(coords, fill = fill, outline = outline, width = width)
+
+    def point(self, x, y, color):
+        return self.handle.create_line(x, y, x + 1, y + 1, fill = color)
+
+    def text(self, x, y, text, fill, font, angle, anchor):
+        return self.handle.create_text(x, y,
+                                       fill = fill,
+                                       font = font,
+                                       angle = angle,
+                                       anchor = anchor,
+                                       text = text)
+
+    def text_bbox(self, x, y, text, font, anchor):
+        item = self.handle.create_text(x, y, font = font, anchor = anchor, text = text)
+        bounds = self.handle.bbox(item)
+        self.handle.delete(item)
+        return bounds
+
+    # change an existing item in place to the result of a draw call
+    def update(self, item, method, args):
+        if method in ('sprite', 'image'):
+            sprite = args[0] if method == 'sprite' else Sprite(args[0])
+            if sprite.photo is None:
+                sprite.photo = ImageTk.PhotoImage(sprite.image)
+            self.__photos[item] = sprite.photo
+            self.handle.coords(item, args[1], args[2])
+            self.handle.itemconfig(item, image = sprite.photo, anchor = args[3])
+        elif method == 'line':
+            coords, fill, width = args
+            self.handle.coords(item, *[c for p in coords for c in p])
+            self.handle.itemconfig(item, fill = fill, width = width)
+        elif method == 'arc':
+            coords, start, extent, outline, width = args
+            self.handle.coords(item, *[c for p in coords for c in p])
+            self.handle.itemconfig(item, start = start, extent = extent, outline = outline, width = width)
+        elif method == 'rectangle':
+            coords, fill, outline = args
+            self.handle.coords(item, *[c for p in coords for c in p])
+            self.handle.itemconfig(item, fill = fill, outline = outline)
+        elif method in ('oval', 'polygon'):
+            coords, fill, outline, width = args
+            self.handle.coords(item, *[c for p in coords for c in p])
+            self.handle.itemconfig(item, fill = fill, outline = outline, width = width)
+        elif method == 'point':
+            x, y, color = args
+            self.handle.coords(item, x, y, x + 1, y + 1)
+            self.handle.itemconfig(item, fill = color)
+        elif method == 'text':
+            x, y, text, fill, font, angle, anchor = args
+            self.handle.coords(item, x, y)
+            self.handle.itemconfig(item, text = text, fill = fill, font = font, angle = angle, anchor = anchor)
+
+    def delete(self, item):
+        self.handle.delete(item)
+        self.__photos.pop(item, None)
+
+    def clear(self):
+        self.handle.delete('all')
+        self.__photos.clear()
+
+    def clear_data(self):
+        pass
+
+    def flush(self):
+        pass
+
+    # items are drawn by tkinter as soon as they are created
+    def present(self):
+        pass
+
+
+# rasterizes every primitive into a single RGB image which is pushed to
+# the screen once per frame. the background is opaque, so an RGB buffer
+# and a masked paste give the same result as blending RGBA layers.
+#
+# with dirty tracking the draw calls of a frame are recorded and compared
+# with the previous frame. only the tiles covered by the bounding boxes of
+# changed calls are rasterized again and uploaded to the screen.
+class FramebufferRenderer:
+    # most draw calls kept for a frame that is never cleared
+    MAX_COMMANDS = 65536
+
+    def __init__(self, width, height, background, handle = None, **kwargs):
+        self.width      = width
+        self.height     = height
+        self.background = background
+        self.handle     = handle
+        self.buffer     = Image.new('RGB', (width, height), background)
+        self.draw       = ImageDraw.Draw(self.buffer)
+        # the PhotoImage and canvas item showing the buffer
+        self.__photo    = None
+        self.__item     = None
+        # position of the buffer being drawn on, when repainting a region
+        self.__ox       = 0
+        self.__oy       = 0
+        self.__painters = {
+            'sprite'   : self.__paint_sprite,
+            'image'    : self.__paint_image,
+            'line'     : self.__paint_line,
+            'arc'      : self.__paint_arc,
+            'rectangle': self.__paint_rectangle,
+            'oval'     : self.__paint_oval,
+            'polygon'  : self.__paint_polygon,
+            'point'    : self.__paint_point,
+            'text'     : self.__paint_text
+        }
+        # dirty rectangle tracking
+        self.dirty      = kwargs.get('dirty', False)
+        self.show_dirty = kwargs.get('showDirty', False)
+        self.tile_size  = kwargs.get('tileSize', 128)
+        # draw calls since the last flush, and their bounding boxes
+        self.__commands = []
+        self.__bounds   = []
+        # draw calls whose pixels are in the buffer
+        self.__shown    = []
+        self.__shown_bounds = []
+        self.__cleared  = False
+        # regions changed since the last upload
+        self.__damage   = []
+        # regions changed in the last presented frame
+        self.dirty_boxes = []
+        # tiles to upload: (box, PhotoImage) by tile position
+        self.__tiles    = {}
+        self.__stale    = set()
+
+    # load a PIL font from a tkinter font description, e.g. 'Tahoma 20 bold'
+    def font(self, family):
+        return load_font(family)
+
+    # draw now, or record the call when tracking dirty rectangles
+    def __submit(self, method, args):
+        if self.dirty:
+            self.__commands.append((method, args))
+            self.__bounds.append(self.bounds(method, args))
+        else:
+            self.__painters[method](*args)
+
+    # rasterize a draw call into the buffer
+    def paint(self, method, args):
+        self.__painters[method](*args)
+
+    def sprite(self, sprite, x, y, anchor):
+        self.__submit('sprite', (sprite, x, y, anchor))
+
+    def image(self, image, x, y, anchor):
+        self.__submit('image', (image, x, y, anchor))
+
+    def line(self, coords, fill, width):
+        self.__submit('line', (coords, fill, width))
+
+    def arc(self, coords, start, extent, outline, width):
+        self.__submit('arc', (coords, start, extent, outline, width))
+
+    def rectangle(self, coords, fill, outline):
+        self.__submit('rectangle', (coords, fill, outline))
+
+    def oval(self, coords, fill, outline, width):
+        self.__submit('oval', (coords, fill, outline, width))
+
+    def polygon(self, coords, fill, outline, width):
+        self.__submit('polygon', (coords, fill, outline, width))
+
+    def point(self, x, y, color):
+        self.__submit('point', (x, y, color))
+
+    def text(self, x, y, text, fill, font, angle, anchor):
+        self.__submit('text', (x, y, text, fill, font, angle, anchor))
+
+    def __paint_sprite(self, sprite, x, y, anchor):
+        self.__paint_image(sprite.image, x, y, anchor)
+
+    def __paint_image(self, image, x, y, anchor):
+        left, top = anchor_position(anchor, x, y, image.width, image.height)
+        if image.mode != 'RGBA':
+            image = image.convert('RGBA')
+        self.buffer.paste(image, (left - self.__ox, top - self.__oy), image)
+
+    def __paint_line(self, coords, fill, width):
+        self.draw.line([(p[0] - self.__ox, p[1] - self.__oy) for p in coords], fill = fill, width = round(width))
+
+    def __paint_arc(self, coords, start, extent, outline, width):
+        (x1, y1), (x2, y2) = coords
+        box = (min(x1, x2) - self.__ox, min(y1, y2) - self.__oy,
+               max(x1, x2) - self.__ox, max(y1, y2) - self.__oy)
+        # tkinter measures angles counterclockwise, PIL clockwise
+        self.draw.arc(box, -(start + extent), -start, fill = outline, width = round(width))
+
+    def __paint_rectangle(self, coords, fill, outline):
+        (x1, y1), (x2, y2) = coords
+        self.draw.rectangle((min(x1, x2) - self.__ox, min(y1, y2) - self.__oy,
+                             max(x1, x2) - self.__ox, max(y1, y2) - self.__oy),
+                            fill = fill or None,
+                            outline = outline or None)
+
+    def __paint_oval(self, coords, fill, outline, width):
+        (x1, y1), (x2, y2) = coords
+        self.draw.ellipse((min(x1, x2) - self.__ox, min(y1, y2) - self.__oy,
+                           max(x1, x2) - self.__ox, max(y1, y2) - self.__oy),
+                          fill = fill or None,
+                          outline = outline or None,
+                          width = round(width))
+
+    def __paint_polygon(self, coords, fill, outline, width):
+        self.draw.polygon([(p[0] - self.__ox, p[1] - self.__oy) for p in coords],
+                          fill = fill or None,
+                          outline = outline or None,
+                          width = round(width))
+
+    def __paint_point(self, x, y, color):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.draw.point((x - self.__ox, y - self.__oy), fill = color)
+
+    def __paint_text(self, x, y, text, fill, font, angle, anchor):
+        pil_font = self.font(font)
+        pil_anchor = TEXT_ANCHORS.get(anchor, 'mm')
+        if angle % 360 == 0:
+            self.draw.multiline_text((x - self.__ox, y - self.__oy), text, fill = fill, font = pil_font, anchor = pil_anchor)
+            return
+        # rotated text is rendered on its own layer and placed around its center
+        x1, y1, x2, y2 = self.draw.multiline_textbbox((x, y), text, font = pil_font, anchor = pil_anchor)
+        self.__paint_image(self.__text_layer(text, fill, pil_font, angle), (x1 + x2) / 2, (y1 + y2) / 2, 'center')
+
+    def __text_layer(self, text, fill, pil_font, angle):
+        lx1, ly1, lx2, ly2 = self.draw.multiline_textbbox((0, 0), text, font = pil_font, anchor = 'la')
+        layer = Image.new('RGBA', (int(lx2 - lx1) + 1, int(ly2 - ly1) + 1))
+        ImageDraw.Draw(layer).multiline_text((-lx1, -ly1), text, fill = fill, font = pil_font, anchor = 'la')
+        return layer.rotate(angle, expand = True)
+
+    def text_bbox(self, x, y, text, font, anchor):
+        return self.draw.multiline_textbbox((x, y), text,
+                                            font = self.font(font),
+                                            anchor = TEXT_ANCHORS.get(anchor, 'mm'))
+
+    # screen area (x1, y1, x2, y2) a draw call can change, or None
+    def bounds(self, method, args):
+        if method in ('sprite', 'image'):
+            image = args[0].image if method == 'sprite' else args[0]
+            left, top = anchor_position(args[3], args[1], args[2], image.width, image.height)
+            box = (left, top, left + image.width, top + image.height)
+        elif method == 'point':
+            box = (args[0], args[1], args[0] + 1, args[1] + 1)
+        elif method == 'text':
+            x, y, text, fill, font, angle, anchor = args
+            x1, y1, x2, y2 = self.text_bbox(x, y, text, font, anchor)
+            if angle % 360 != 0:
+                # any rotation of the text fits in the circle around its box
+                r = math.hypot(x2 - x1, y2 - y1) / 2
+                cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+                x1, y1, x2, y2 = cx - r, cy - r, cx + r, cy + r
+            box = (x1, y1, x2, y2)
+        else:
+            coords = args[0]
+            width = args[-1] if method in ('line', 'arc', 'oval', 'polygon') else 1
+            xs = [p[0] for p in coords]
+            ys = [p[1] for p in coords]
+            box = (min(xs) - width, min(ys) - width, max(xs) + width, max(ys) + width)
+        x1 = max(int(math.floor(box[0])) - 1, 0)
+        y1 = max(int(math.floor(box[1])) - 1, 0)
+        x2 = min(int(math.ceil(box[2])) + 2, self.width)
+        y2 = min(int(math.ceil(box[3])) + 2, self.height)
+        if x1 >= x2 or y1 >= y2:
+            return None
+        return (x1, y1, x2, y2)
+
+    # tile positions covered by boxes
+    def __tiles_of(self, boxes):
+        size = self.tile_size
+        tiles = set()
+        for x1, y1, x2, y2 in boxes:
+            for ty in range(y1 // size, (y2 - 1) // size + 1):
+                for tx in range(x1 // size, (x2 - 1) // size + 1):
+                    tiles.add((tx, ty))
+        return tiles
+
+    # rasterize the given draw calls again. with boxes, only the tiles
+    # covered by them are cleared and redrawn, otherwise the whole buffer.
+    # commands are (method, args, bounds) tuples.
+    def repaint(self, commands, boxes = None):
+        if boxes is None:
+            self.clear_buffer()
+            for method, args, bounds in commands:
+                self.__painters[method](*args)
+            return
+        size = self.tile_size
+        buffer, draw = self.buffer, self.draw
+        # redraw rows of adjacent dirty tiles as one region
+        tiles = sorted(self.__tiles_of(boxes), key = lambda t: (t[1], t[0]))
+        spans = []
+        for tx, ty in tiles:
+            if spans and spans[-1][1] == ty and spans[-1][2] == tx:
+                spans[-1][2] = tx + 1
+            else:
+                spans.append([tx, ty, tx + 1])
+        for tx1, ty, tx2 in spans:
+            x1, y1 = tx1 * size, ty * size
+            x2, y2 = min(tx2 * size, self.width), min(y1 + size, self.height)
+            region = Image.new('RGB', (x2 - x1, y2 - y1), self.background)
+            self.buffer, self.draw = region, ImageDraw.Draw(region)
+            self.__ox, self.__oy = x1, y1
+            try:
+                for method, args, bounds in commands:
+                    if bounds is not None and bounds[0] < x2 and bounds[2] > x1 and bounds[1] < y2 and bounds[3] > y1:
+                        self.__painters[method](*args)
+            finally:
+                self.buffer, self.draw = buffer, draw
+                self.__ox, self.__oy = 0, 0
+            buffer.paste(region, (x1, y1))
+
+    def clear_buffer(self):
+        self.draw.rectangle((0, 0, self.width, self.height), fill = self.background)
+
+    def clear(self):
+        if self.dirty:
+            # the buffer is kept until the next frame is compared with it
+            self.__commands = []
+            self.__bounds = []
+            self.__cleared = True
+        else:
+            self.clear_buffer()
+
+    def clear_data(self):
+        pass
+
+    # bring the buffer up to date with the recorded draw calls
+    def flush(self):
+        if not self.dirty:
+            return
+        commands, bounds = self.__commands, self.__bounds
+        self.__commands, self.__bounds = [], []
+        if not self.__cleared:
+            # nothing was cleared, new calls are drawn over the buffer
+            for method, args in commands:
+                self.__painters[method](*args)
+            self.__damage.extend(b for b in bounds if b is not None)
+            if self.__shown is not None:
+                self.__shown.extend(commands)
+                self.__shown_bounds.extend(bounds)
+                # sketches that never clear would keep every call forever
+                if len(self.__shown) > self.MAX_COMMANDS:
+                    self.__shown = self.__shown_bounds = None
+            return
+        self.__cleared = False
+        shown, shown_bounds = self.__shown, self.__shown_bounds
+        self.__shown, self.__shown_bounds = commands, bounds
+        if shown is None:
+            self.repaint([(m, a, b) for (m, a), b in zip(commands, bounds)])
+            self.__damage.append((0, 0, self.width, self.height))
+            return
+        # compare with the previous frame. calls shared at the start and
+        # end of both frames are skipped, the rest is compared one by one
+        # when nothing was added or removed in between.
+        start, common = 0, min(len(shown), len(commands))
+        while start < common and shown[start] == commands[start]:
+            start += 1
+        tail = 0
+        while tail < common - start and shown[-1 - tail] == commands[-1 - tail]:
+            tail += 1
+        old = range(start, len(shown) - tail)
+        new = range(start, len(commands) - tail)
+        boxes = []
+        if len(old) == len(new):
+            for i in new:
+                if shown[i] != commands[i]:
+                    boxes.append(shown_bounds[i])
+                    boxes.append(bounds[i])
+        else:
+            boxes.extend(shown_bounds[i] for i in old)
+            boxes.extend(bounds[i] for i in new)
+        boxes = [b for b in boxes if b is not None]
+        self.repaint([(m, a, b) for (m, a), b in zip(commands, bounds)], boxes)
+        self.__damage.extend(boxes)
+
+    # upload the buffer to the screen
+    def present(self):
+        self.flush()
+        self.dirty_boxes, self.__damage = self.__damage, []
+        if self.handle is None:
+            return
+        if not self.dirty:
+            if self.__photo is None:
+                self.__photo = ImageTk.PhotoImage(self.buffer)
+                self.__item = self.handle.create_image(0, 0, image = self.__photo, anchor = 'nw')
+            else:
+                self.__photo.paste(self.buffer)
+            return
+        size = self.tile_size
+        if not self.__tiles:
+            for ty in range(0, (self.height - 1) // size + 1):
+                for tx in range(0, (self.width - 1) // size + 1):
+                    box = (tx * size, ty * size,
+                           min((tx + 1) * size, self.width), min((ty + 1) * size, self.height))
+                    photo = ImageTk.PhotoImage(self.buffer.crop(box))
+                    self.handle.create_image(box[0], box[1], image = photo, anchor = 'nw')
+                    self.__tiles[(tx, ty)] = (box, photo)
+            return
+        # tiles showing last frame's debug overlay are uploaded again
+        tiles = self.__tiles_of(self.dirty_boxes) | self.__stale
+        self.__stale = set()
+        for tile in tiles:
+            box, photo = self.__tiles[tile]
+            image = self.buffer.crop(box)
+            if self.show_dirty:
+                overlay = ImageDraw.Draw(image)
+                for x1, y1, x2, y2 in self.dirty_boxes:
+                    overlay.rectangle((x1 - box[0], y1 - box[1], x2 - box[0] - 1, y2 - box[1] - 1), outline = 'red')
+                self.__stale.add(tile)
+            photo.paste(image)
+
+
+# draws on a display renderer and mirrors every shape into a second one,
+# e.g. a framebuffer capturing the pixels shown by tkinter items
+class MirrorRenderer:
+    def __init__(self, renderer, mirror):
+        self.renderer = renderer
+        self.mirror   = mirror
+
+    def sprite(self, sprite, x, y, anchor):
+        self.mirror.sprite(sprite, x, y, anchor)
+        return self.renderer.sprite(sprite, x, y, anchor)
+
+    def image(self, image, x, y, anchor):
+        self.mirror.image(image, x, y, anchor)
+        return self.renderer.image(image, x, y, anchor)
+
+    def line(self, coords, fill, width):
+        self.mirror.line(coords, fill, width)
+        return self.renderer.line(coords, fill, width)
+
+    def arc(self, coords, start, extent, outline, width):
+        self.mirror.arc(coords, start, extent, outline, width)
+        return self.renderer.arc(coords, start, extent, outline, width)
+
+    def rectangle(self, coords, fill, outline):
+        self.mirror.rectangle(coords, fill, outline)
+        return self.renderer.rectangle(coords, fill, outline)
+
+    def oval(self, coords, fill, outline, width):
+        self.mirror.oval(coords, fill, outline, width)
+        return self.renderer.oval(coords, fill, outline, width)
+
+    def polygon(self, coords, fill, outline, width):
+        self.mirror.polygon(coords, fill, outline, width)
+        return self.renderer.polygon(coords, fill, outline, width)
+
+    def point(self, x, y, color):
+        self.mirror.point(x, y, color)
+        return self.renderer.point(x, y, color)
+
+    def text(self, x, y, text, fill, font, angle, anchor):
+        self.mirror.text(x, y, text, fill, font, angle, anchor)
+        return self.renderer.text(x, y, text, fill, font, angle, anchor)
+
+    def text_bbox(self, x, y, text, font, anchor):
+        return self.renderer.text_bbox(x, y, text, font, anchor)
+
+    # items only exist on the display renderer
+    def delete(self, item):
+        self.renderer.delete(item)
+
+    def clear(self):
+        self.mirror.clear()
+        self.renderer.clear()
+
+    def clear_data(self):
+        self.mirror.clear_data()
+        self.renderer.clear_data()
+
+    def flush(self):
+        self.mirror.flush()
+        self.renderer.flush()
+
+    def present(self):
+        self.mirror.present()
+        self.renderer.present()
+
+
+# a recorded draw call of a retained scene
+class Command:
+    __slots__ = ('key', 'method', 'args', 'item')
+
+    def __init__(self, key, method, args):
+        self.key    = key
+        self.method = method
+        self.args   = args
+        # tkinter item showing the command
+        self.item   = None
+
+
+# keeps every draw call in a display list instead of forgetting it after
+# the frame. tkinter items are created once and changed in place when a
+# command is replaced. the framebuffer is redrawn from the display list
+# whenever it has changed.
+class RetainedRenderer:
+    def __init__(self, display = None, framebuffer = None):
+        self.display     = display
+        self.framebuffer = framebuffer
+        # display list, in drawing order
+        self.commands    = {}
+        # receives the commands of the shape being drawn
+        self.recording   = None
+        # receives the commands of the shape being redrawn
+        self.replacing   = None
+        self.__keys      = itertools.count()
+        self.__changed   = True
+
+    def __call(self, method, *args):
+        command = Command(next(self.__keys), method, args)
+        if self.replacing is not None:
+            self.replacing.append(command)
+            return None
+        if self.display is not None:
+            command.item = getattr(self.display, method)(*args)
+        self.commands[command.key] = command
+        if self.recording is not None:
+            self.recording.append(command)
+        self.__changed = True
+        return command.item
+
+    def sprite(self, sprite, x, y, anchor):
+        return self.__call('sprite', sprite, x, y, anchor)
+
+    def image(self, image, x, y, anchor):
+        return self.__call('image', image, x, y, anchor)
+
+    def line(self, coords, fill, width):
+        return self.__call('line', coords, fill, width)
+
+    def arc(self, coords, start, extent, outline, width):
+        return self.__call('arc', coords, start, extent, outline, width)
+
+    def rectangle(self, coords, fill, outline):
+        return self.__call('rectangle', coords, fill, outline)
+
+    def oval(self, coords, fill, outline, width):
+        return self.__call('oval', coords, fill, outline, width)
+
+    def polygon(self, coords, fill, outline, width):
+        return self.__call('polygon', coords, fill, outline, width)
+
+    def point(self, x, y, color):
+        return self.__call('point', x, y, color)
+
+    def text(self, x, y, text, fill, font, angle, anchor):
+        return self.__call('text', x, y, text, fill, font, angle, anchor)
+
+    def text_bbox(self, x, y, text, font, anchor):
+        renderer = self.display if self.display is not None else self.framebuffer
+        return renderer.text_bbox(x, y, text, font, anchor)
+
+    # swap the commands of a shape for its redrawn commands,
+    # keeping their place in the display list
+    def replace(self, old, new):
+        for i, command in enumerate(new):
+            if i < len(old):
+                previous = old[i]
+                command.key = previous.key
+                if self.display is not None:
+                    if previous.method == command.method:
+                        self.display.update(previous.item, command.method, command.args)
+                        command.item = previous.item
+                    else:
+                        self.display.delete(previous.item)
+                        command.item = getattr(self.display, command.method)(*command.args)
+            elif self.display is not None:
+                command.item = getattr(self.display, command.method)(*command.args)
+            self.commands[command.key] = command
+        self.remove(old[len(new):])
+        self.__changed = True
+
+    def remove(self, commands):
+        for command in commands:
+            if self.commands.pop(command.key, None) is not None and self.display is not None:
+                self.display.delete(command.item)
+        self.__changed = True
+
+    # move commands to the end (front) or start (back) of the display list
+    def reorder(self, commands, front = True):
+        moved = {c.key: c for c in commands if c.key in self.commands}
+        rest = {k: c for k, c in self.commands.items() if k not in moved}
+        self.commands = {**rest, **moved} if front else {**moved, **rest}
+        self.__changed = True
+
+    # start drawing the display list into a framebuffer
+    def attach(self, framebuffer):
+        self.framebuffer = framebuffer
+        self.__changed = True
+
+    def clear(self):
+        self.commands.clear()
+        if self.display is not None:
+            self.display.clear()
+        self.__changed = True
+
+    def clear_data(self):
+        pass
+
+    # redraw the framebuffer from the display list
+    def flush(self):
+        if self.framebuffer is None or not self.__changed:
+            return
+        self.framebuffer.clear()
+        for command in self.commands.values():
+            getattr(self.framebuffer, command.method)(*command.args)
+        self.__changed = False
+
+    def present(self):
+        self.flush()
+        if self.framebuffer is not None:
+            self.framebuffer.present()
+        if self.display is not None:
+            self.display.present()
@@ -0,0 +1,67 @@
+# handle to a shape drawn on a retained canvas.
+# the shape remembers the primitive that drew it together with the canvas
+# parameters at that time. changing it redraws the primitive, which
+# updates the existing tkinter items in place.
+class Shape:
+    def __init__(self, redraw, remove, method, args, kwargs, parameters, vertices, commands):
+        self.__redraw    = redraw
+        self.__remove    = remove
+        self.method      = method
+        self.args        = args
+        self.kwargs      = kwargs
+        self.parameters  = parameters
+        self.vertices    = vertices
+        # recorded draw calls of the shape
+        self.commands    = commands
+        self.removed     = False
+
+    # tkinter items showing the shape
+    @property
+    def items(self):
+        return [c.item for c in self.commands if c.item is not None]
+
+    # draw the shape again with new arguments,
+    # e.g. shape.update(x, y, radius) for a circle
+    def update(self, *args, **kwargs):
+        if args:
+            self.args = args
+        self.kwargs.update(kwargs)
+        self.__redraw(self)
+
+    # set the origin the shape is drawn relative to
+    def translate(self, x, y):
+        self.parameters['center_x'] = x
+        self.parameters['center_y'] = y
+        self.__redraw(self)
+
+    # move the shape by dx, dy
+    def move(self, dx, dy):
+        self.translate(self.parameters['center_x'] + dx,
+                       self.parameters['center_y'] + dy)
+
+    def rotate(self, deg):
+        self.parameters['rotate_deg'] = deg
+        self.__redraw(self)
+
+    def fill(self, color):
+        self.parameters['fill_color'] = color
+        self.__redraw(self)
+
+    def stroke(self, color):
+        self.parameters['stroke_color'] = color
+        self.parameters['stroke_disabled'] = False
+        self.__redraw(self)
+
+    def stroke_width(self, width):
+        self.parameters['stroke_width'] = width
+        self.__redraw(self)
+
+    def font_color(self, color):
+        self.parameters['font_color'] = color
+        self.__redraw(self)
+
+    # delete the shape from the canvas
+    def remove(self):
+        if not self.removed:
+            self.__remove(self)
+            self.removed = True
@@ -0,0 +1,147 @@
+import csv
+import json
+import os
+import time
+
+import numpy as np
+
+
+# phases of a frame, in the order they run. 'rasterize' (drawing with PIL)
+# and 'tk' (creating and changing tkinter items) are measured wherever they
+# happen in the frame, mostly inside 'draw', and are left out of the phase
+# they happened in.
+PHASES = ('clear', 'update', 'draw', 'rasterize', 'tk', 'export', 'stats', 'present', 'capture')
+
+# file formats timings can be written to
+FORMATS = ('.csv', '.json')
+
+
+# measures a phase of a timer in a with statement
+class Measure:
+    __slots__ = ('timer', 'phase')
+
+    def __init__(self, timer, phase):
+        self.timer = timer
+        self.phase = phase
+
+    def __enter__(self):
+        self.timer.start(self.phase)
+
+    def __exit__(self, *exc):
+        self.timer.stop()
+
+
+# keeps the duration of every phase of the last frames in a ring buffer.
+# a frame is timed by calling begin(), then lap(phase) after each phase
+# and end() when it is done. work inside a phase can be measured
+# separately with start(phase) and stop(), measure(phase) or timed().
+class FrameTimer:
+    def __init__(self, capacity = 300, phases = PHASES):
+        self.capacity = capacity
+        self.phases   = phases
+        # one row per frame: the frame number, every phase and the total, in seconds
+        self.__rows   = np.zeros((capacity, len(phases) + 2))
+        self.__index  = 0
+        self.count    = 0
+        self.__column = {phase: i + 1 for i, phase in enumerate(phases)}
+        self.__start  = 0
+        self.__last   = 0
+        # seconds measured separately since the last lap
+        self.__taken  = 0.0
+        # phase measured by start() and stop(), its start time and nesting
+        self.__phase  = None
+        self.__opened = 0
+        self.__depth  = 0
+        self.__measures = {}
+
+    def begin(self):
+        self.__rows[self.__index] = 0
+        self.__start = self.__last = time.perf_counter()
+        self.__taken = 0.0
+
+    # add the time since the previous lap to a phase,
+    # except the time measured separately
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.__rows[self.__index, self.__column[phase]] += now - self.__last - self.__taken
+        self.__last = now
+        self.__taken = 0.0
+
+    # measure a phase until stop(). nested measurements count
+    # towards the outermost one only.
+    def start(self, phase):
+        if self.__depth == 0:
+            self.__phase = phase
+            self.__opened = time.perf_counter()
+        self.__depth += 1
+
+    def stop(self):
+        self.__depth -= 1
+        if self.__depth == 0:
+            elapsed = time.perf_counter() - self.__opened
+            self.__rows[self.__index, self.__column[self.__phase]] += elapsed
+            self.__taken += elapsed
+
+    # context manager measuring a phase
+    def measure(self, phase):
+        if phase not in self.__measures:
+            self.__measures[phase] = Measure(self, phase)
+        return self.__measures[phase]
+
+    # wrap a function so its calls are measured as a phase
+    def timed(self, phase, function):
+        def measured(*args, **kwargs):
+            self.start(phase)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.stop()
+        return measured
+
+    def end(self, frame):
+        self.__rows[self.__index, 0] = frame
+        self.__rows[self.__index, -1] = time.perf_counter() - self.__start
+        self.__index = (self.__index + 1) % self.capacity
+        self.count += 1
+
+    # recorded frames, oldest first
+    def rows(self):
+        if self.count < self.capacity:
+            return self.__rows[:self.count]
+        return np.roll(self.__rows, -self.__index, axis = 0)
+
+    # percentiles of every phase and the total frame time, in milliseconds
+    def stats(self):
+        rows = self.rows()
+        result = {}
+        for i, phase in enumerate(self.phases + ('total',)):
+            times = rows[:, i + 1] * 1000
+            if len(times) == 0:
+                result[phase] = {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+                continue
+            p50, p95, p99 = np.percentile(times, (50, 95, 99)).tolist()
+            result[phase] = {'p50': p50, 'p95': p95, 'p99': p99, 'max': float(times.max())}
+        return result
+
+    # write the recorded frames to a .csv or .json file, times in milliseconds
+    def dump(self, path):
+        columns = ('frame',) + self.phases + ('total',)
+        records = [[int(row[0])] + (row[1:] * 1000).tolist() for row in self.rows()]
+        ext = check_format(path)
+        if ext == '.csv':
+            with open(path, 'w', newline = '') as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                writer.writerows(records)
+        elif ext == '.json':
+            with open(path, 'w') as f:
+                json.dump({'frames': [dict(zip(columns, r)) for r in records],
+                           'stats': self.stats()}, f, indent = 2)
+
+
+# extension of a timings file, ValueError if it is not a supported format
+def check_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError("unsupported timing format '%s', expected .csv or .json" % ext)
+    return ext
@@ -1,7 +1,12 @@
 import math
 import random
 
+import numpy as np
+
 class Vector:
+    # no per-instance __dict__, vectors are small and created often
+    __slots__ = ('x', 'y')
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
@@ -31,6 +36,38 @@ class Vector:
             raise ValueError('The right-hand side must be int or float!')
         return Vector(self.x / val, self.y / val)
 
+    # In-place addition, changes this vector instead of creating one
+    def __iadd__(self, v2):
+        self.x += v2.x
+        self.y += v2.y
+        return self
+
+    # In-place subtraction
+    def __isub__(self, v2):
+        self.x -= v2.x
+        self.y -= v2.y
+        return self
+
+    # In-place element-wise or scalar multiplication
+    def __imul__(self, v2):
+        if isinstance(v2, Vector):
+            self.x *= v2.x
+            self.y *= v2.y
+        elif isinstance(v2, (int, float)):
+            self.x *= v2
+            self.y *= v2
+        else:
+            return NotImplemented
+        return self
+
+    # In-place division by scalar
+    def __itruediv__(self, val):
+        if not isinstance(val, (int, float)):
+            raise ValueError('The right-hand side must be int or float!')
+        self.x /= val
+        self.y /= val
+        return self
+
     # Dot product
     def dot(self, v2):
         return self.x * v2.x + self.y * v2.y
@@ -57,7 +94,7 @@ class Vector:
 
     # Heading angle of the vector
     def heading(self):
-        return self.angle_between(Vector(1, 0))
+        return -math.degrees(math.atan2(-self.y, self.x))
 
     # Set the magnitude of the vector
     def set_mag(self, mag):
@@ -70,21 +107,23 @@ class Vector:
 
     # Square of the magnitude
     def mag_square(self):
-        return self.length() ** 2
+        return self.x * self.x + self.y * self.y
 
     # Limit the length of the vector
     def limit(self, max_value):
-        mSq = self.mag_square()
-        if mSq > max_value ** 2:
-            vec = (self / math.sqrt(mSq)) * max_value
-            self.x, self.y = vec.x, vec.y
+        mSq = self.x * self.x + self.y * self.y
+        if mSq > max_value * max_value:
+            l = math.sqrt(mSq)
+            self.x = self.x / l * max_value
+            self.y = self.y / l * max_value
 
     # Normalize the vector
     def normalize(self):
-        l = self.mag()
+        l = math.hypot(self.x, self.y)
         if l != 0:
-            vec = self * (1 / l)
-            self.x, self.y = vec.x, vec.y
+            inv = 1 / l
+            self.x *= inv
+            self.y *= inv
 
     # Create a copy of the vector
     def copy(self):
@@ -119,3 +158,239 @@ class VectorFromAngle:
         x = length * math.cos(math.radians(angle))
         y = length * math.sin(math.radians(angle))
         return Vector(x, y)
+
+
+# N 2D vectors stored in one contiguous (N, 2) float array, for updating
+# many vectors at once. Operators and methods work on all vectors together
+# and accept a VectorArray, a Vector, an (x, y) tuple, a scalar, or one
+# scalar per vector as a 1-D NumPy array.
+class VectorArray:
+    __slots__ = ('data',)
+
+    def __init__(self, vectors):
+        if isinstance(vectors, VectorArray):
+            vectors = vectors.data
+        elif len(vectors) and isinstance(vectors[0], Vector):
+            vectors = [(v.x, v.y) for v in vectors]
+        self.data = np.array(vectors, dtype = float).reshape(-1, 2)
+
+    # N zero vectors
+    @classmethod
+    def zeros(cls, count):
+        return cls(np.zeros((count, 2)))
+
+    # Vectors from x and y component arrays
+    @classmethod
+    def from_components(cls, x, y):
+        return cls(np.column_stack(np.broadcast_arrays(np.asarray(x, dtype = float),
+                                                       np.asarray(y, dtype = float))))
+
+    # Vectors from angles in degrees, like VectorFromAngle
+    @classmethod
+    def from_angles(cls, angles, length = 1):
+        angles = np.radians(np.asarray(angles, dtype = float))
+        length = np.asarray(length, dtype = float)
+        return cls.from_components(length * np.cos(angles), length * np.sin(angles))
+
+    # N random unit vectors
+    @classmethod
+    def random(cls, count):
+        return cls.from_angles(np.random.uniform(0, 360, count))
+
+    # x components, a view that can be written to
+    @property
+    def x(self):
+        return self.data[:, 0]
+
+    # y components, a view that can be written to
+    @property
+    def y(self):
+        return self.data[:, 1]
+
+    def __len__(self):
+        return len(self.data)
+
+    # A Vector for an index, a VectorArray for a slice or mask
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            x, y = self.data[index].tolist()
+            return Vector(x, y)
+        return VectorArray(self.data[index])
+
+    def __setitem__(self, index, value):
+        if isinstance(value, (tuple, list, Vector)) or np.ndim(value) != 1:
+            self.data[index] = self.__operand(value)
+        else:
+            # One value per selected vector
+            self.data[index] = np.asarray(value, dtype = float)[:, None]
+
+    def __iter__(self):
+        return (Vector(x, y) for x, y in self.data.tolist())
+
+    def __array__(self, dtype = None, copy = None):
+        return self.data if dtype is None else self.data.astype(dtype)
+
+    # Operand as an array that broadcasts against the (N, 2) data.
+    # A tuple or list of two numbers is one vector; use a 1-D NumPy array
+    # for one scalar per vector.
+    def __operand(self, value):
+        if isinstance(value, VectorArray):
+            return value.data
+        if isinstance(value, Vector):
+            return np.array((value.x, value.y))
+        if isinstance(value, (tuple, list)) and len(value) == 2 and all(np.isscalar(v) for v in value):
+            return np.array(value, dtype = float)
+        value = np.asarray(value, dtype = float)
+        if value.ndim == 1:
+            if len(value) != len(self.data):
+                raise ValueError('Expected an (x, y) pair or one value per vector (%d), got %d values.'
+                                 % (len(self.data), len(value)))
+            # One scalar per vector scales both of its components
+            return value[:, None]
+        return value
+
+    def __add__(self, other):
+        return VectorArray(self.data + self.__operand(other))
+
+    def __sub__(self, other):
+        return VectorArray(self.data - self.__operand(other))
+
+    # Element-wise or scalar multiplication
+    def __mul__(self, other):
+        return VectorArray(self.data * self.__operand(other))
+
+    def __rmul__(self, other):
+        return self * other
+
+    def __truediv__(self, other):
+        return VectorArray(self.data / self.__operand(other))
+
+    def __neg__(self):
+        return VectorArray(-self.data)
+
+    # In-place operators change the array instead of creating one
+    def __iadd__(self, other):
+        self.data += self.__operand(other)
+        return self
+
+    def __isub__(self, other):
+        self.data -= self.__operand(other)
+        return self
+
+    def __imul__(self, other):
+        self.data *= self.__operand(other)
+        return self
+
+    def __itruediv__(self, other):
+        self.data /= self.__operand(other)
+        return self
+
+    # Dot products, one per vector
+    def dot(self, other):
+        return (self.data * self.__operand(other)).sum(axis = 1)
+
+    # Cross products, one per vector
+    def cross(self, other):
+        other = np.broadcast_to(self.__operand(other), self.data.shape)
+        return self.data[:, 0] * other[:, 1] - self.data[:, 1] * other[:, 0]
+
+    # Lengths of the vectors
+    def length(self):
+        return np.hypot(self.data[:, 0], self.data[:, 1])
+
+    def mag(self):
+        return self.length()
+
+    def mag_square(self):
+        return np.einsum('ij,ij->i', self.data, self.data)
+
+    # Heading angles in degrees, as Vector.heading
+    def heading(self):
+        return -np.degrees(np.arctan2(-self.data[:, 1], self.data[:, 0]))
+
+    # Distances from a Vector or from the vectors of another VectorArray
+    def distance_from(self, other):
+        d = self.data - self.__operand(other)
+        return np.hypot(d[:, 0], d[:, 1])
+
+    # Normalize the vectors in place, zero vectors stay zero
+    def normalize(self):
+        l = self.mag()
+        np.divide(self.data, l[:, None], out = self.data, where = l[:, None] != 0)
+
+    # Limit the lengths of the vectors in place
+    def limit(self, max_value):
+        mSq = self.mag_square()
+        max_value = np.broadcast_to(np.asarray(max_value, dtype = float), mSq.shape)
+        over = mSq > max_value * max_value
+        if over.any():
+            self.data[over] *= (max_value[over] / np.sqrt(mSq[over]))[:, None]
+
+    def copy(self):
+        return VectorArray(self.data.copy())
+
+    def to_list(self):
+        return list(self)
+
+
+# Particles with a position, velocity and acceleration each, stored in
+# VectorArrays so forces and motion are computed for all of them at once
+# and they are drawn as one batch.
+class ParticleSystem:
+    def __init__(self, positions = (), velocities = None, mass = 1):
+        self.position     = VectorArray(positions)
+        count = len(self.position)
+        self.velocity     = VectorArray.zeros(count) if velocities is None else VectorArray(velocities)
+        self.acceleration = VectorArray.zeros(count)
+        # One mass for all particles or one per particle
+        self.mass         = np.broadcast_to(np.asarray(mass, dtype = float), (count,)).copy()
+
+    def __len__(self):
+        return len(self.position)
+
+    # Add particles at positions, with optional velocities and masses
+    def add(self, positions, velocities = None, mass = 1):
+        positions = VectorArray(positions)
+        count = len(positions)
+        velocities = VectorArray.zeros(count) if velocities is None else VectorArray(velocities)
+        self.position.data     = np.concatenate((self.position.data, positions.data))
+        self.velocity.data     = np.concatenate((self.velocity.data, velocities.data))
+        self.acceleration.data = np.concatenate((self.acceleration.data, np.zeros((count, 2))))
+        self.mass = np.concatenate((self.mass, np.broadcast_to(np.asarray(mass, dtype = float), (count,))))
+
+    # Remove the particles selected by a boolean mask or indices
+    def remove(self, selection):
+        keep = np.ones(len(self), dtype = bool)
+        keep[selection] = False
+        self.position.data     = self.position.data[keep]
+        self.velocity.data     = self.velocity.data[keep]
+        self.acceleration.data = self.acceleration.data[keep]
+        self.mass              = self.mass[keep]
+
+    # Apply a force to every particle, one Vector for all or one per particle
+    def apply_force(self, force):
+        forces = VectorArray.zeros(len(self)) + force
+        forces /= self.mass
+        self.acceleration += forces
+
+    # Pull every particle towards a point with a force of strength * mass / d^2.
+    # Distances are at least min_distance, so nearby particles are not flung away.
+    def attract(self, point, strength, min_distance = 1):
+        direction = -self.position + point
+        d = np.maximum(direction.mag(), min_distance)
+        direction /= d
+        self.acceleration += direction * (strength / (d * d))
+
+    # Advance the particles by dt: accelerate, limit the speed if max_speed
+    # is given, move, then clear the acceleration for the next step
+    def update(self, dt = 1, max_speed = None):
+        self.velocity += self.acceleration * dt
+        if max_speed is not None:
+            self.velocity.limit(max_speed)
+        self.position += self.velocity * dt
+        self.acceleration.data.fill(0)
+
+    # Draw the particles as circles in one batch, see Canvas.circles
+    def draw(self, canvas, radius = 2, colors = None, **kwargs):
+        if len(self):
+            canvas.circles(self.position.data, radius, colors, **kwargs)
@@ -10,19 +10,33 @@
 
 import tkinter as tk
 import time
+from collections import deque
+
+from PIL import Image, ImageDraw
 
 from EasyDraw import Color
 from EasyDraw import Canvas
+from EasyDraw import Profiler
+from EasyDraw import Renderer
+from EasyDraw import Timing
 from EasyDraw.Tools import *
 from EasyDraw import Vector
 
 class EasyDraw(object):
+    # most fixed updates run before a frame
+    MAX_UPDATE_STEPS = 8
+    # seconds of frames the stats overlay averages over
+    STATS_WINDOW     = 1.0
+    # seconds between redraws of the stats overlay
+    STATS_REFRESH    = 0.25
+
     # EasyDraw main class
     def __init__(self, **kwargs):
         print('Hello from EasyDraw!')
         # app clock
         self.tick         = 1
-        self.__start_time = time.time()
+        # start times of the frames of the last stats window
+        self.__frame_starts = deque(maxlen = 1000)
         # window size
         self.width        = kwargs.get('width', 400)
         self.height       = kwargs.get('height', 400)
@@ -30,15 +44,33 @@ class EasyDraw(object):
         self.fullscreen   = kwargs.get('fullscreen', False)
         # clear screen on each frame
         self.autoClear    = kwargs.get('autoClear', True)
+        # keep shapes across frames and change them through their handles
+        self.retained     = kwargs.get('retained', False)
         # show stats on screen
         self.showStats    = kwargs.get('showStats', False)
         # frames per second
-        self.interval     = kwargs.get('fps', 24)
-        if self.interval not in range(0, 1001):
-            raise ValueError("invalid fps value should be between 1 and 1000 but '%d' was entered." % self.interval)
-        self.interval     = 1000 // self.interval
-        # path to save rendered frames as GIF file
+        self.fps          = kwargs.get('fps', 24)
+        if not 1 <= self.fps <= 1000:
+            raise ValueError("invalid fps value should be between 1 and 1000 but '%d' was entered." % self.fps)
+        # milliseconds per frame, as stored in exported files
+        self.interval     = 1000 // self.fps
+        # seconds since the previous frame, fixed to 1 / fps in headless mode
+        self.dt           = 1 / self.fps
+        # frames left out because drawing fell behind the frame rate
+        self.skipped_frames = 0
+        # duration of every phase of the last frames
+        self.timer        = Timing.FrameTimer(kwargs.get('timingFrames', 300))
+        # .csv or .json file the frame timings are written to on exit
+        self.timing_path  = kwargs.get('timingPath', '')
+        if self.timing_path != '':
+            Timing.check_format(self.timing_path)
+        # monotonic time the next frame is due and the last frame started
+        self.__deadline   = None
+        self.__last_frame = None
+        # path to save rendered frames as GIF, APNG, PNG sequence or video stream
         self.export_path  = kwargs.get('exportPath', '')
+        # number of processes encoding exported frames
+        self.export_workers = kwargs.get('exportWorkers', None)
         if self.export_path != '':
             print('Recording frames...')
         # mouse position relative to origin
@@ -54,43 +86,51 @@ class EasyDraw(object):
         self.scale_y      = 0
         self.bound_center = (0, 0)
         
-        master         = tk.Tk()
-        self.master    = master
-
-        if self.fullscreen:
-            master.attributes("-fullscreen", True)
-            master.update()
-            self.width = master.winfo_width()
-            self.height = master.winfo_height()
-
-        # bind mouse event handlers
-        master.bind('<Motion>'         , self.__motion_event)
-        master.bind('<Button-1>'       , self.__mouse_left_btn_click)
-        master.bind('<Button-2>'       , self.__mouse_middle_btn_click)
-        master.bind('<Button-3>'       , self.__mouse_right_btn_click)
-        master.bind('<B1-Motion>'      , self.__left_mouse_btn_down)
-        master.bind('<B3-Motion>'      , self.__right_mouse_btn_down)
-        master.bind('<ButtonRelease-1>', self.__left_mouse_btn_up)
-        master.bind('<ButtonRelease-3>', self.__right_mouse_btn_up)
-        # bind keyboard events
-        master.bind('<Escape>', self.__on_escape_key)
-        master.bind('<Key>', self.__on_key_press)
-        master.bind('<KeyRelease>', self.__on_key_release)
-
-        # set window title
-        master.title(kwargs.get('title', 'EasyDraw App'))
-        # bind onWindowClose event
-        master.protocol("WM_DELETE_WINDOW", self.__on_closing)
+        # render without a window, as fast as possible
+        self.headless     = kwargs.get('headless', False)
+        # number of frames to render in headless mode
+        self.frame_count  = kwargs.get('frames', 1)
+        # receives every rendered frame in headless mode
+        self.frameFunction = kwargs.get('frameFunc', None)
+        # rendered frames, kept in headless mode when no frameFunc is given
+        self.frames       = []
+
+        if self.headless:
+            self.master = None
+        else:
+            self.master = self.__create_window(**kwargs)
 
         self.bg_color = kwargs.get('background', 'silver')
         self.showGrid = kwargs.get('showGrid', False)
-
-        self.canvas = Canvas.Canvas(master,
+        # 'tk' (one canvas item per shape) or 'framebuffer' (one image per frame)
+        self.renderer = 'framebuffer' if self.headless else kwargs.get('renderer', 'tk')
+        # redraw and upload only the changed regions of each frame (framebuffer renderer)
+        self.dirtyRects = kwargs.get('dirtyRects', False)
+        # outline the changed regions on screen
+        self.showDirty  = kwargs.get('showDirty', False)
+
+        self.canvas = Canvas.Canvas(self.master,
                             app = self,
                             width = self.width,
                             height = self.height,
                             background = self.bg_color,
-                            showGrid = self.showGrid)
+                            showGrid = self.showGrid,
+                            renderer = self.renderer,
+                            capture = self.export_path != '' or kwargs.get('capture', False),
+                            spriteCacheSize = kwargs.get('spriteCacheSize', 256),
+                            assetCacheSize = kwargs.get('assetCacheSize', 64 * 1024 * 1024),
+                            retained = self.retained,
+                            dirtyRects = self.dirtyRects or self.showDirty,
+                            showDirty = self.showDirty,
+                            shapeMode = kwargs.get('shapeMode', 'auto'))
+        self.canvas.set_timer(self.timer)
+        # count calls and time of canvas primitives, see Profiler
+        self.profiler = None
+        self.profile_path = kwargs.get('profilePath', '')
+        if kwargs.get('profile', False) or self.profile_path != '':
+            self.profiler = Profiler.Profiler(self.canvas)
+        if self.export_path != '':
+            self.canvas.start_recording(self.export_path, self.fps, self.export_workers)
 
         # deprecated -------------------------
         self.tools = Tools()
@@ -109,6 +149,12 @@ class EasyDraw(object):
         except ImportError:
             self.drawFunction = kwargs.get('drawFunc', None)
 
+        # called at a fixed rate, independent of the frame rate,
+        # to advance simulations by update_dt seconds
+        self.updateFunction = kwargs.get('updateFunc', None)
+        self.update_dt      = 1 / kwargs.get('updateRate', self.fps)
+        self.__accumulator  = 0
+
         self.keyPressFunc      = kwargs.get('keyPressFunc', None)
         self.keyReleaseFunc    = kwargs.get('keyReleaseFunc', None)
         
@@ -142,9 +188,51 @@ class EasyDraw(object):
                 by = (max_y*self.scale_y)
             self.bound_center = (bx, by)
 
-        master.after(100, self.__setup())
-        master.after(100, self.__animate())
-        master.mainloop()
+        # stats overlay image and the time it was drawn
+        self.__stats_image = None
+        self.__stats_time  = None
+        if self.retained and self.showGrid:
+            self.canvas.showGrid()
+
+        if self.headless:
+            self.__setup()
+            for i in range(self.frame_count):
+                self.__render_frame()
+            self.__on_closing()
+        else:
+            self.master.after(100, self.__setup())
+            self.master.after(100, self.__animate())
+            self.master.mainloop()
+
+    def __create_window(self, **kwargs):
+        master = tk.Tk()
+
+        if self.fullscreen:
+            master.attributes("-fullscreen", True)
+            master.update()
+            self.width = master.winfo_width()
+            self.height = master.winfo_height()
+
+        # bind mouse event handlers
+        master.bind('<Motion>'         , self.__motion_event)
+        master.bind('<Button-1>'       , self.__mouse_left_btn_click)
+        master.bind('<Button-2>'       , self.__mouse_middle_btn_click)
+        master.bind('<Button-3>'       , self.__mouse_right_btn_click)
+        master.bind('<B1-Motion>'      , self.__left_mouse_btn_down)
+        master.bind('<B3-Motion>'      , self.__right_mouse_btn_down)
+        master.bind('<ButtonRelease-1>', self.__left_mouse_btn_up)
+        master.bind('<ButtonRelease-3>', self.__right_mouse_btn_up)
+        # bind keyboard events
+        master.bind('<Escape>', self.__on_escape_key)
+        master.bind('<Key>', self.__on_key_press)
+        master.bind('<KeyRelease>', self.__on_key_release)
+
+        # set window title
+        master.title(kwargs.get('title', 'EasyDraw App'))
+        # bind onWindowClose event
+        master.protocol("WM_DELETE_WINDOW", self.__on_closing)
+
+        return master
 
 
     def clearBounds(self):
@@ -203,15 +291,35 @@ class EasyDraw(object):
         if self.mouseUpFunction:
             self.mouseUpFunction(self, 'right')
             
+    # frames per second and frame times in milliseconds over the last
+    # stats window, as (fps, average, min, max)
+    def __rolling_stats(self):
+        starts = self.__frame_starts
+        while len(starts) > 2 and starts[-1] - starts[0] > self.STATS_WINDOW:
+            starts.popleft()
+        fps = 0.0
+        if len(starts) > 1 and starts[-1] > starts[0]:
+            fps = (len(starts) - 1) / (starts[-1] - starts[0])
+        times = self.timer.rows()[-len(starts):, -1] * 1000
+        if len(times) == 0:
+            return fps, 0.0, 0.0, 0.0
+        return fps, float(times.mean()), float(times.min()), float(times.max())
+
+    # the overlay is drawn as an image that is only redrawn a few times
+    # per second, so showing it hardly adds to the frame time it reports
     def __show_stats(self):
-        c = self.canvas
-        c.push()
-        c.translate(0, 0)
-        c.font_color('white')
-        c.text_anchor('nw')
-        c.font_family('courier 12')
+        now = time.perf_counter()
+        if self.__stats_image is None or now - self.__stats_time >= self.STATS_REFRESH:
+            self.__stats_image = self.__stats_overlay()
+            self.__stats_time = now
+        self.canvas.overlay(self.__stats_image, 8, 8)
+
+    def __stats_overlay(self):
+        fps, average, fastest, slowest = self.__rolling_stats()
         text = (
-            f'fps:        {(self.tick / (time.time() - self.__start_time)):.2f}\n'\
+            f'fps:        {fps:.2f}\n'\
+            f'frame:      {average:.2f} ms\n'\
+            f'min / max:  {fastest:.2f} / {slowest:.2f} ms\n'\
             f'tick:       {self.tick}\n\n'\
 
             f'win width:  {self.width}\n'\
@@ -222,13 +330,11 @@ class EasyDraw(object):
             f'mouse x:    {self.mouse_x:.2f}\n'\
             f'mouse y:    {self.mouse_y:.2f}'
         )
-        obj = c.text(24, 24, text)
-        bounds = c.handle.bbox(obj)
-        c.fill('black')
-        c.stroke('black')
-        c.rect(bounds[0] - 16, bounds[1] - 16, bounds[2] + 16, bounds[3] + 16, alpha = .7)
-        c.bring_to_front(obj)
-        c.pop()
+        font = Renderer.load_font('courier 12')
+        left, top, right, bottom = ImageDraw.Draw(Image.new('RGBA', (1, 1))).multiline_textbbox((0, 0), text, font = font)
+        image = Image.new('RGBA', (right - left + 32, bottom - top + 32), (0, 0, 0, 178))
+        ImageDraw.Draw(image).multiline_text((16 - left, 16 - top), text, fill = 'white', font = font)
+        return image
 
     def __setup(self):
         if callable(self.setupFunction):
@@ -238,34 +344,109 @@ class EasyDraw(object):
         else:
             raise TypeError('Setup function is either undefined or not callable!')
         
-    def __animate(self):
-        if self.autoClear is True:
+    def __render_frame(self):
+        timer = self.timer
+        timer.begin()
+        self.__frame_starts.append(time.perf_counter())
+        # retained shapes are never cleared automatically
+        if self.retained:
+            pass
+        elif self.autoClear is True:
             self.canvas.clear('all')        
             self.canvas.clear_data()
         else:
             if self.showGrid:
                 self.canvas.showGrid()
+        timer.lap('clear')
+        self.__advance_clock()
+        if callable(self.updateFunction):
+            self.__update()
+        timer.lap('update')
         if callable(self.drawFunction):
             self.tick += 1
-            mx = self.master.winfo_pointerx() - self.master.winfo_rootx()
-            my = self.master.winfo_pointery() - self.master.winfo_rooty()
-            if mx > 0 and mx <= self.width and my > 0 and my <= self.height:
-                self.__get_mouse_positions(Vector.Vector(mx, my))
+            if not self.headless:
+                mx = self.master.winfo_pointerx() - self.master.winfo_rootx()
+                my = self.master.winfo_pointery() - self.master.winfo_rooty()
+                if mx > 0 and mx <= self.width and my > 0 and my <= self.height:
+                    self.__get_mouse_positions(Vector.Vector(mx, my))
             self.drawFunction(self)
         else:
             raise Exception('Draw function is either undefined or not callable!')
+        timer.lap('draw')
         if self.export_path != '':
             self.canvas.export_frame()
+        timer.lap('export')
         if self.showStats:
             self.__show_stats()
-        self.canvas.handle.after(self.interval, self.__animate)
+        timer.lap('stats')
+        self.canvas.present()
+        timer.lap('present')
+        if self.headless:
+            frame = self.canvas.snapshot()
+            if callable(self.frameFunction):
+                self.frameFunction(self, frame)
+            else:
+                self.frames.append(frame)
+        timer.lap('capture')
+        timer.end(self.tick)
+        if self.profiler is not None:
+            self.profiler.frame()
+
+    # p50, p95 and p99 duration in milliseconds of every phase of the last
+    # frames: clear, update, draw, rasterize, tk, export, stats, present,
+    # capture and total
+    def frame_stats(self):
+        return self.timer.stats()
+
+    # measure the time since the previous frame
+    def __advance_clock(self):
+        now = time.perf_counter()
+        if not self.headless and self.__last_frame is not None:
+            self.dt = now - self.__last_frame
+        self.__last_frame = now
+
+    # run as many fixed updates as the elapsed time calls for
+    def __update(self):
+        self.__accumulator += self.dt
+        steps = 0
+        # a small tolerance keeps rounding from dropping a step
+        while self.__accumulator >= self.update_dt - 1e-9:
+            if steps == self.MAX_UPDATE_STEPS:
+                # too far behind to catch up, the rest of the time is dropped
+                self.__accumulator = 0
+                break
+            self.updateFunction(self)
+            self.__accumulator -= self.update_dt
+            steps += 1
+
+    # render a frame and schedule the next one at its deadline. deadlines
+    # are a whole number of frames apart, so the frame rate does not drift
+    # with the drawing time; frames whose deadline has passed are skipped.
+    def __animate(self):
+        frame_time = 1 / self.fps
+        if self.__deadline is None:
+            self.__deadline = time.perf_counter()
+        self.__render_frame()
+        self.__deadline += frame_time
+        now = time.perf_counter()
+        if now > self.__deadline:
+            missed = int((now - self.__deadline) / frame_time) + 1
+            self.skipped_frames += missed
+            self.__deadline += missed * frame_time
+        self.canvas.handle.after(max(0, round((self.__deadline - now) * 1000)), self.__animate)
 
     def __on_closing(self):
+        if self.timing_path != '':
+            self.timer.dump(self.timing_path)
+            print('Saved frame timings to %s' % self.timing_path)
+        if self.profile_path != '':
+            self.profiler.dump(self.profile_path)
+            print('Saved profile to %s' % self.profile_path)
         if self.export_path != '':
-            print('Saving frames as GIF file... please wait!')
-            self.canvas.save_frames(self.export_path, self.interval)
-            print('Done!')
-        self.master.destroy()
+            self.canvas.save_frames()
+            print('Saved recording to %s' % self.export_path)
+        if self.master is not None:
+            self.master.destroy()
 
     def __on_escape_key(self, e):
         self.__on_closing()
@@ -47,10 +47,8 @@ class Particle:
     def show(self):
         app_hdl.canvas.stroke('yellow')
         app_hdl.canvas.fill('yellow')
-            
-        for p in range(1, len(self.history)-1):
-            app_hdl.canvas.line(self.history[p-1].x, self.history[p-1].y,
-                                self.history[p].x, self.history[p].y)
+
+        app_hdl.canvas.polyline(self.history)
 
 
 class Blackhole:
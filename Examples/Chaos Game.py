@@ -30,6 +30,7 @@ def setup(app):
     app.lastVertex = 0
 
 def draw(app):
+    xs, ys, colors = [], [], []
     for i in range(0, 500):
         r = random.randint(0, count - 1)
         
@@ -38,9 +39,14 @@ def draw(app):
         app.x = app.tools.lerp(app.x, app.points[r]['x'], jump)
         app.y = app.tools.lerp(app.y, app.points[r]['y'], jump)
 
-        app.canvas.point(app.x, app.y, app.points[r]['color'])
+        xs.append(app.x)
+        ys.append(app.y)
+        colors.append(app.points[r]['color'])
 
         app.lastVertex = r
+
+    # plot all points of the frame at once
+    app.canvas.points(xs, ys, colors)
     
 
 ed.EasyDraw(width = width,
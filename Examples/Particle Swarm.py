@@ -0,0 +1,40 @@
+from EasyDraw import EasyDraw
+from EasyDraw.Vector import Vector, VectorArray, ParticleSystem
+import numpy as np
+
+WIDTH = 800
+HEIGHT = 800
+
+total = 2000
+max_speed = 8
+
+
+def setup(app):
+    app.canvas.translate(WIDTH // 2, HEIGHT // 2)
+    # all particles live in one ParticleSystem instead of a list of objects
+    app.swarm = ParticleSystem(VectorArray.random(total) * np.random.uniform(50, 350, total),
+                               VectorArray.random(total) * 2)
+
+
+def draw(app):
+    swarm = app.swarm
+    # particles are pulled towards the mouse and slowed by a little drag
+    swarm.attract(Vector(app.mouse_x, app.mouse_y), 2000, min_distance = 20)
+    swarm.apply_force(swarm.velocity * -0.01)
+    swarm.update(1, max_speed)
+
+    # faster particles are brighter
+    speed = swarm.velocity.mag() / max_speed
+    colors = np.column_stack((80 + 175 * speed, 120 + 100 * speed, np.full(total, 255)))
+    swarm.draw(app.canvas, 2, colors)
+
+
+EasyDraw(width = WIDTH,
+        height = HEIGHT,
+        fps = 30,
+        background = 'black',
+        title = 'Particle Swarm',
+        autoClear = True,
+        showStats = True,
+        setupFunc = setup,
+        drawFunc = draw)
@@ -0,0 +1,58 @@
+# microbenchmark of the per-call cost of the overloaded Canvas methods.
+# every call is timed on a headless canvas, so the numbers contain the
+# argument handling, the transformation and the framebuffer draw call.
+#
+#   python benchmarks/bench_dispatch.py [calls]
+import os
+import sys
+import timeit
+
+from PIL import Image
+
+# benchmark the working tree rather than an installed copy
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from EasyDraw import EasyDraw
+from EasyDraw.Vector import Vector
+
+
+# microseconds per call of each overload
+def run(calls = 20000):
+    results = {}
+
+    def setup(app):
+        c = app.canvas
+        v1, v2, v3 = Vector(1, 2), Vector(30, 40), Vector(10, 50)
+        image = Image.new('RGBA', (4, 4))
+        cases = {
+            'line(x1, y1, x2, y2)':       lambda: c.line(1, 2, 30, 40),
+            'line(v1, v2)':               lambda: c.line(v1, v2),
+            'line(v)':                    lambda: c.line(v2),
+            'point(x, y, color)':         lambda: c.point(5, 5, 'red'),
+            'point(v, color)':            lambda: c.point(v1, 'red'),
+            'triangle(x1, ..., y3)':      lambda: c.triangle(1, 2, 30, 40, 10, 50),
+            'triangle(v1, v2, v3)':       lambda: c.triangle(v1, v2, v3),
+            'create_image(x, y, image)':  lambda: c.create_image(5, 5, image),
+            'create_image(v, image)':     lambda: c.create_image(v1, image),
+        }
+        for name, case in cases.items():
+            # fewer calls for the slower shapes
+            number = calls if not name.startswith(('triangle', 'create_image')) else calls // 10
+            results[name] = min(timeit.repeat(case, number = number, repeat = 3)) / number * 1e6
+            c.clear('all')
+
+    EasyDraw(headless = True,
+             frames = 0,
+             setupFunc = setup,
+             drawFunc = lambda app: None)
+    return results
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    for name, us in run(calls).items():
+        print('%-28s %8.2f us/call' % (name, us))
+
+
+if __name__ == '__main__':
+    main()
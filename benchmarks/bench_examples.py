@@ -0,0 +1,66 @@
+# replays the shipped examples headlessly for a fixed number of frames.
+# EasyDraw is patched to run in headless mode before an example is
+# loaded, so the examples run unchanged and need no display. random and
+# numpy.random are seeded the same way for every run.
+#
+#   python benchmarks/bench_examples.py [frames]
+import contextlib
+import io
+import os
+import random
+import runpy
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+# benchmark the working tree rather than an installed copy
+sys.path.insert(0, ROOT)
+
+import EasyDraw
+
+EXAMPLES = ("Conway's Game of Life", 'Blackhole', 'Marching Squares', 'Chaos Game', 'Particle Swarm')
+
+
+# milliseconds per frame of each example. examples that cannot run,
+# e.g. because an optional module is missing, are reported in skipped
+def run(frames = 30, examples = EXAMPLES):
+    results = {}
+    skipped = {}
+    original = EasyDraw.EasyDraw
+
+    def headless(**kwargs):
+        kwargs.update(headless = True, frames = frames, frameFunc = lambda app, frame: None)
+        kwargs.pop('exportPath', None)
+        return original(**kwargs)
+
+    EasyDraw.EasyDraw = headless
+    try:
+        for name in examples:
+            random.seed(0)
+            np.random.seed(0)
+            start = time.perf_counter()
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    runpy.run_path(os.path.join(ROOT, 'Examples', name + '.py'), run_name = '__main__')
+            except ImportError as e:
+                skipped[name] = str(e)
+                continue
+            results[name] = (time.perf_counter() - start) * 1000 / frames
+    finally:
+        EasyDraw.EasyDraw = original
+    return results, skipped
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    results, skipped = run(frames)
+    for name, ms in results.items():
+        print('%-24s %8.2f ms/frame' % (name, ms))
+    for name, reason in skipped.items():
+        print('%-24s skipped: %s' % (name, reason))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# benchmark of every Canvas primitive at several object counts.
+# each case draws count objects on a headless canvas and presents the
+# frame, so the numbers contain the transformation, rasterization and
+# framebuffer work of one frame.
+#
+#   python benchmarks/bench_primitives.py [count ...]
+import os
+import random
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+# benchmark the working tree rather than an installed copy
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from EasyDraw import EasyDraw
+
+COUNTS = (100, 1000, 10000)
+WIDTH  = 400
+HEIGHT = 400
+
+
+# functions drawing count objects, given the canvas and random coordinates
+def cases(image):
+    def shapes(c, xy, count):
+        c.begin_shape()
+        for x, y in xy[:count]:
+            c.vertex(x, y)
+        c.end_shape()
+
+    return {
+        'circle':       lambda c, xy, n: [c.circle(x, y, 5) for x, y in xy[:n]],
+        'rect':         lambda c, xy, n: [c.rect(x, y, x + 8, y + 8) for x, y in xy[:n]],
+        'line':         lambda c, xy, n: [c.line(x, y, y, x) for x, y in xy[:n]],
+        'triangle':     lambda c, xy, n: [c.triangle(x, y, x + 8, y, x, y + 8) for x, y in xy[:n]],
+        'arc':          lambda c, xy, n: [c.arc(x, y, x + 8, y + 8, 0, 90) for x, y in xy[:n]],
+        'text':         lambda c, xy, n: [c.text(x, y, 'text') for x, y in xy[:n]],
+        'point':        lambda c, xy, n: [c.point(x, y, 'white') for x, y in xy[:n]],
+        'create_image': lambda c, xy, n: [c.create_image(x, y, image) for x, y in xy[:n]],
+        'end_shape':    shapes,
+        'polyline':     lambda c, xy, n: c.polyline(xy[:n]),
+        'points':       lambda c, xy, n: c.points(xy[:n, 0], xy[:n, 1], 'white'),
+        'circles':      lambda c, xy, n: c.circles(xy[:n], 5),
+        'rects':        lambda c, xy, n: c.rects(np.hstack((xy[:n], xy[:n] + 8))),
+        'lines':        lambda c, xy, n: c.lines(np.hstack((xy[:n], xy[:n, ::-1]))),
+    }
+
+
+# milliseconds per frame of each primitive at each count, keyed 'name/count'
+def run(counts = COUNTS, repeat = 3):
+    results = {}
+    rng = random.Random(0)
+    xy = np.array([(rng.randint(-WIDTH // 2, WIDTH // 2), rng.randint(-HEIGHT // 2, HEIGHT // 2))
+                   for _ in range(max(counts))])
+    image = Image.new('RGBA', (8, 8), 'red')
+
+    def setup(app):
+        c = app.canvas
+        c.translate(WIDTH // 2, HEIGHT // 2)
+        for name, case in cases(image).items():
+            for count in counts:
+                best = None
+                for _ in range(repeat):
+                    c.clear('all')
+                    start = time.perf_counter()
+                    case(c, xy, count)
+                    c.present()
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                results['%s/%d' % (name, count)] = best * 1000
+
+    EasyDraw(headless = True,
+             frames = 0,
+             width = WIDTH,
+             height = HEIGHT,
+             setupFunc = setup,
+             drawFunc = lambda app: None)
+    return results
+
+
+def main():
+    counts = tuple(int(n) for n in sys.argv[1:]) or COUNTS
+    for name, ms in run(counts).items():
+        print('%-22s %10.2f ms' % (name, ms))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# microbenchmark of the Vector math operations.
+#
+#   python benchmarks/bench_vector.py [calls]
+import os
+import sys
+import timeit
+
+# benchmark the working tree rather than an installed copy
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from EasyDraw.Vector import Vector
+
+
+# microseconds per call of each operation
+def run(calls = 100000):
+    v1, v2 = Vector(3.0, 4.0), Vector(-1.5, 2.5)
+    cases = {
+        'Vector(x, y)':     lambda: Vector(3.0, 4.0),
+        'v1 + v2':          lambda: v1 + v2,
+        'v1 - v2':          lambda: v1 - v2,
+        'v1 * 2':           lambda: v1 * 2,
+        'v1 * v2':          lambda: v1 * v2,
+        'v1 / 2':           lambda: v1 / 2,
+        '-v1':              lambda: -v1,
+        'dot':              lambda: v1.dot(v2),
+        'cross':            lambda: v1.cross(v2),
+        'mag':              lambda: v1.mag(),
+        'mag_square':       lambda: v1.mag_square(),
+        'heading':          lambda: v1.heading(),
+        'distance_from':    lambda: v1.distance_from(v2),
+        'angle_between':    lambda: v1.angle_between(v2),
+        'copy':             lambda: v1.copy(),
+        'lerp':             lambda: v1.lerp(v2, .5),
+        'normalize':        lambda: v1.copy().normalize(),
+        'limit':            lambda: v1.copy().limit(2),
+        'set_mag':          lambda: v1.copy().set_mag(2),
+        'project':          lambda: v1.project(v2),
+        'reflect':          lambda: v1.reflect(v2),
+    }
+    return {name: min(timeit.repeat(case, number = calls, repeat = 3)) / calls * 1e6
+            for name, case in cases.items()}
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for name, us in run(calls).items():
+        print('%-18s %8.3f us/call' % (name, us))
+
+
+if __name__ == '__main__':
+    main()
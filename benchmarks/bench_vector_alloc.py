@@ -0,0 +1,133 @@
+# allocation microbenchmark of Vector. it reports the memory of one
+# vector, the vectors created by each operation and the cost of a
+# particle update, as in the Blackhole example, written with the
+# allocating operators and with the in-place ones.
+#
+#   python benchmarks/bench_vector_alloc.py [particles] [steps]
+import operator
+import os
+import sys
+import time
+import tracemalloc
+
+# benchmark the working tree rather than an installed copy
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from EasyDraw.Vector import Vector
+
+DT    = .1
+SPEED = 50
+
+
+# counts the vectors created while it is active
+class CreatedVectors:
+    def __enter__(self):
+        self.count = 0
+        self.__init = Vector.__init__
+        init = self.__init
+
+        def counting(vector, x, y):
+            self.count += 1
+            init(vector, x, y)
+        Vector.__init__ = counting
+        return self
+
+    def __exit__(self, *exc):
+        Vector.__init__ = self.__init
+
+
+# traced bytes per vector, measured over many vectors
+def vector_bytes(count = 100000):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    vectors = [Vector(float(i), float(i)) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # the list holding them is not part of a vector
+    return (after - before - sys.getsizeof(vectors)) / count
+
+
+# vectors created by one call of each operation
+def created_per_operation():
+    v1, v2 = Vector(3.0, 4.0), Vector(-1.5, 2.5)
+    cases = {
+        'v1 + v2':    lambda a: a + v2,
+        'v1 += v2':   lambda a: operator.iadd(a, v2),
+        'v1 * 2':     lambda a: a * 2,
+        'v1 *= 2':    lambda a: operator.imul(a, 2),
+        'mag':        lambda a: a.mag(),
+        'mag_square': lambda a: a.mag_square(),
+        'heading':    lambda a: a.heading(),
+        'normalize':  lambda a: a.normalize(),
+        'limit':      lambda a: a.limit(1),
+    }
+    result = {}
+    for name, case in cases.items():
+        a = v1.copy()
+        with CreatedVectors() as created:
+            case(a)
+        result[name] = created.count
+    return result
+
+
+def particles(count):
+    return [[Vector(i, i * .5), Vector(SPEED, 0), Vector(1.0, -2.0)] for i in range(count)]
+
+
+# a particle update written with operators that create new vectors
+def update_allocating(particle):
+    position, velocity, acceleration = particle
+    acceleration = acceleration * DT
+    velocity = velocity + acceleration
+    if velocity.mag() > SPEED:
+        velocity = velocity / velocity.mag() * SPEED
+    position = position + velocity * DT
+    particle[0], particle[1], particle[2] = position, velocity, acceleration * 0
+
+
+# the same update changing the vectors in place
+def update_inplace(particle):
+    position, velocity, acceleration = particle
+    acceleration *= DT
+    velocity += acceleration
+    velocity.limit(SPEED)
+    position.x += velocity.x * DT
+    position.y += velocity.y * DT
+    acceleration *= 0
+
+
+# vectors and their bytes created per particle update, and microseconds
+# per particle update, of both versions
+def run(count = 1000, steps = 50):
+    size = vector_bytes()
+    result = {'vector_bytes': size}
+    for name, update in (('allocating', update_allocating), ('inplace', update_inplace)):
+        state = particles(count)
+        with CreatedVectors() as created:
+            for particle in state:
+                update(particle)
+        result[name + '_created_per_update'] = created.count / count
+        result[name + '_bytes_per_update'] = created.count / count * size
+
+        state = particles(count)
+        start = time.perf_counter()
+        for _ in range(steps):
+            for particle in state:
+                update(particle)
+        result[name + '_us_per_update'] = (time.perf_counter() - start) / (count * steps) * 1e6
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    print('vectors created by one call')
+    for name, created in created_per_operation().items():
+        print('  %-12s %d' % (name, created))
+    print('particle update, %d particles x %d steps' % (count, steps))
+    for name, value in run(count, steps).items():
+        print('  %-32s %10.2f' % (name, value))
+
+
+if __name__ == '__main__':
+    main()
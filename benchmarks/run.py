@@ -0,0 +1,114 @@
+# runs the benchmark suites, writes the results as JSON and compares
+# them with a stored baseline. all numbers are times, lower is better.
+#
+#   python benchmarks/run.py --output results.json
+#   python benchmarks/run.py --baseline results.json
+#
+# with a baseline, the exit status is 1 if any benchmark got slower
+# than the threshold allows.
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+
+# the suites next to this file, which put the working tree on the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy
+import PIL
+
+import bench_dispatch
+import bench_examples
+import bench_primitives
+import bench_vector
+
+SUITES = ('primitives', 'vector', 'dispatch', 'examples')
+UNITS  = {'primitives': 'ms/frame', 'vector': 'us/call', 'dispatch': 'us/call', 'examples': 'ms/frame'}
+
+
+def run(suites = SUITES, quick = False):
+    results = {}
+    skipped = {}
+    if 'primitives' in suites:
+        results['primitives'] = bench_primitives.run((100, 1000) if quick else bench_primitives.COUNTS)
+    if 'vector' in suites:
+        results['vector'] = bench_vector.run(20000 if quick else 100000)
+    if 'dispatch' in suites:
+        results['dispatch'] = bench_dispatch.run(5000 if quick else 20000)
+    if 'examples' in suites:
+        results['examples'], skipped['examples'] = bench_examples.run(10 if quick else 30)
+    return {
+        'meta': {
+            'date': datetime.datetime.now().isoformat(timespec = 'seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': numpy.__version__,
+            'pillow': PIL.__version__,
+            'quick': quick,
+        },
+        'units': {suite: UNITS[suite] for suite in results},
+        'results': results,
+        'skipped': skipped,
+    }
+
+
+# (suite, name, baseline, current, ratio) of every benchmark in both runs
+def compare(baseline, current):
+    rows = []
+    for suite, results in current['results'].items():
+        before = baseline['results'].get(suite, {})
+        for name, value in results.items():
+            if name in before and before[name] > 0:
+                rows.append((suite, name, before[name], value, value / before[name]))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Run the EasyDraw benchmarks.')
+    parser.add_argument('--suite', action = 'append', choices = SUITES,
+                        help = 'suite to run, can be repeated (default: all)')
+    parser.add_argument('--quick', action = 'store_true',
+                        help = 'smaller object counts and fewer frames')
+    parser.add_argument('--output', help = 'write the results to this JSON file')
+    parser.add_argument('--baseline', help = 'compare with the results in this JSON file')
+    parser.add_argument('--threshold', type = float, default = .1,
+                        help = 'slowdown reported as a regression (default: 0.1 = 10%%)')
+    args = parser.parse_args()
+
+    with open(os.devnull, 'w') as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            current = run(args.suite or SUITES, args.quick)
+        finally:
+            sys.stdout = stdout
+
+    for suite, results in current['results'].items():
+        print('\n[%s] %s' % (suite, current['units'][suite]))
+        for name, value in results.items():
+            print('  %-28s %10.3f' % (name, value))
+        for name, reason in current['skipped'].get(suite, {}).items():
+            print('  %-28s skipped: %s' % (name, reason))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent = 2)
+        print('\nSaved results to %s' % args.output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(baseline, current)
+        regressions = [row for row in rows if row[4] > 1 + args.threshold]
+        print('\ncompared with %s (%s)' % (args.baseline, baseline['meta']['date']))
+        for suite, name, before, after, ratio in rows:
+            mark = '  slower' if ratio > 1 + args.threshold else ''
+            print('  %-12s %-28s %10.3f -> %10.3f  x%.2f%s' % (suite, name, before, after, ratio, mark))
+        print('%d of %d benchmarks slower by more than %d%%' % (len(regressions), len(rows), args.threshold * 100))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
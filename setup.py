@@ -20,8 +20,7 @@ setuptools.setup(
     ],
     python_requires='>=3.6',
     install_requires=[
-        "pyscreenshot",
-        "Pillow",
-        "multipledispatch"
+        "Pillow>=10.1",
+        "numpy"
     ]
 )
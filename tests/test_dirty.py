@@ -0,0 +1,42 @@
+# frames drawn with dirty rectangles must match frames drawn in full
+import numpy as np
+
+from EasyDraw import EasyDraw
+
+
+def draw(app):
+    c = app.canvas
+    c.fill('red')
+    c.circle(-150 + app.tick * 7 % 300, -100, 20)
+    c.fill('blue')
+    c.rect(0, 0, 80, 40)
+    c.stroke('green')
+    c.stroke_width(3)
+    c.line(-200, -200, app.tick * 5 % 400 - 200, 199)
+    c.font_color('white')
+    c.text(0, 150, 'tick %d' % app.tick)
+    if app.tick % 3 == 0:
+        c.fill('yellow')
+        c.circle(100, 100, 30)
+    c.points([50 + app.tick], [50], 'white')
+
+
+def render(**kwargs):
+    frames = []
+    EasyDraw(headless = True,
+             frames = 12,
+             width = 400,
+             height = 400,
+             setupFunc = lambda app: None,
+             drawFunc = draw,
+             frameFunc = lambda app, frame: frames.append(np.asarray(frame)),
+             **kwargs)
+    return frames
+
+
+def test_dirty_frames_match_full_frames():
+    full = render()
+    dirty = render(dirtyRects = True)
+    assert len(full) == len(dirty)
+    for i, (a, b) in enumerate(zip(full, dirty)):
+        assert np.array_equal(a, b), 'frame %d differs' % i
@@ -0,0 +1,28 @@
+# plotting into the pixel buffer
+import numpy as np
+
+from EasyDraw import EasyDraw
+
+
+def render(draw):
+    frames = []
+    EasyDraw(headless = True,
+             frames = 1,
+             width = 20,
+             height = 20,
+             background = 'black',
+             setupFunc = lambda app: None,
+             drawFunc = draw,
+             frameFunc = lambda app, frame: frames.append(np.asarray(frame)))
+    return frames[0]
+
+
+def test_points_without_points_draw_nothing():
+    frame = render(lambda app: app.canvas.points([], [], 'white'))
+    assert not frame[..., :3].any()
+
+
+def test_points_with_one_color_per_point():
+    frame = render(lambda app: app.canvas.points([1, 2], [3, 4], np.array([(255, 0, 0), (0, 0, 255)])))
+    assert tuple(frame[3, 1, :3]) == (255, 0, 0)
+    assert tuple(frame[4, 2, :3]) == (0, 0, 255)
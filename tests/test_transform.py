@@ -0,0 +1,61 @@
+# single shapes must follow the transformation like the batched ones
+import math
+
+import numpy as np
+import pytest
+
+from EasyDraw import EasyDraw
+
+ANGLE = math.radians(45)
+TRANSFORMS = {
+    'scale':  lambda c: c.apply_matrix(3, 0, 0, 0, 3, 0),
+    'rotate': lambda c: c.apply_matrix(math.cos(ANGLE), -math.sin(ANGLE), 0,
+                                       math.sin(ANGLE), math.cos(ANGLE), 0),
+    'zoom':   lambda c: c.zoom(3),
+    'turn':   lambda c: c.rotate(30),
+}
+
+
+# bounding box of the drawn pixels
+def bbox(frame):
+    ys, xs = np.nonzero(np.asarray(frame)[..., :3].any(2))
+    return np.array((xs.min(), ys.min(), xs.max(), ys.max()))
+
+
+def render(transform, shape, **kwargs):
+    frames = []
+
+    def draw(app):
+        c = app.canvas
+        c.translate(100, 100)
+        transform(c)
+        c.fill('red')
+        c.no_stroke()
+        shape(c)
+
+    EasyDraw(headless = True,
+             frames = 1,
+             width = 200,
+             height = 200,
+             background = 'black',
+             setupFunc = lambda app: None,
+             drawFunc = draw,
+             frameFunc = lambda app, frame: frames.append(bbox(frame)),
+             **kwargs)
+    return frames[0]
+
+
+@pytest.mark.parametrize('transform', TRANSFORMS)
+@pytest.mark.parametrize('shapeMode', ('native', 'image'))
+def test_circle_matches_circles(transform, shapeMode):
+    single = render(TRANSFORMS[transform], lambda c: c.circle(0, 0, 10), shapeMode = shapeMode)
+    batch = render(TRANSFORMS[transform], lambda c: c.circles([(0, 0)], 10))
+    assert np.abs(single - batch).max() <= 1
+
+
+@pytest.mark.parametrize('transform', TRANSFORMS)
+@pytest.mark.parametrize('shapeMode', ('native', 'image'))
+def test_rect_matches_rects(transform, shapeMode):
+    single = render(TRANSFORMS[transform], lambda c: c.rect(-20, -5, 20, 5), shapeMode = shapeMode)
+    batch = render(TRANSFORMS[transform], lambda c: c.rects([(-20, -5, 20, 5)]))
+    assert np.abs(single - batch).max() <= 1